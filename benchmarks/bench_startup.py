@@ -0,0 +1,68 @@
+"""Startup benchmark: importing what a consumer uses from inflation_core must stay well under the budget.
+
+Each sample runs in a fresh interpreter so nothing is already in sys.modules,
+and times ``from inflation_core import calculate_inflation`` (which loads the
+dataset, loader and inflation modules). NumPy and pandas are imported and
+timed first, so the budget applies to what inflation_core adds on top of its
+dependencies. Exits with status 1 when the median exceeds the budget.
+
+    python benchmarks/bench_startup.py [--runs 15] [--budget-ms 100]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = '''
+import time
+start = time.perf_counter()
+import numpy, pandas
+dependencies = time.perf_counter()
+from inflation_core import calculate_inflation
+print(dependencies - start, time.perf_counter() - dependencies)
+'''
+
+FIRST_LOAD_PROBE = '''
+import time
+import inflation_core
+start = time.perf_counter()
+inflation_core.load_dataset()
+print(time.perf_counter() - start)
+'''
+
+
+def sample(probe, runs):
+    """Run probe in runs fresh interpreters and return the timings (tuples of seconds) each printed."""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', probe], cwd=REPO_ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(tuple(float(value) for value in output.strip().splitlines()[-1].split()))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    args = parser.parse_args(argv)
+
+    imports = sample(IMPORT_PROBE, args.runs)
+    dependencies_ms = statistics.median(dependencies for dependencies, _ in imports) * 1000
+    import_ms = statistics.median(core for _, core in imports) * 1000
+    first_load_ms = statistics.median(timing for timing, in sample(FIRST_LOAD_PROBE, max(1, args.runs // 3))) * 1000
+    print(f"import numpy, pandas: {dependencies_ms:.2f} ms")
+    print(f"from inflation_core import calculate_inflation: {import_ms:.2f} ms on top (budget {args.budget_ms:.0f} ms)")
+    print(f"first load_dataset(): {first_load_ms:.2f} ms")
+    if import_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Benchmark suite for the load, lookup, compute, plotting and render paths.
+
+Each case is timed on the shipped June2024_Full_City.csv and on a synthetic
+table scaled up to thousands of series over 50+ years of months, priced with
+a basket of 500+ items. Results are written as JSON; compare two result files
+to flag cases that got slower.
+
+    python benchmarks/bench_suite.py run -o bench.json [--quick]
+    python benchmarks/bench_suite.py compare baseline.json bench.json [--threshold 0.2]
+
+compare exits with status 1 when any case's median time grew by more than
+the threshold (a fraction of the baseline median).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from inflation_core import PriceDataset, calculate_inflation, format_period, get_june_data, read_price_csv  # noqa: E402
+from inflation_core.basket import BasketState  # noqa: E402
+from inflation_core.cube import LogPriceCube  # noqa: E402
+from inflation_core.indexes import chained_index_batch  # noqa: E402
+from inflation_core.projection import fit_projection, simulate_costs  # noqa: E402
+from inflation_core.search import CatalogIndex  # noqa: E402
+from inflation_core.series import BasketSeriesEngine  # noqa: E402
+from inflation_views import build_total_cost_chart, item_table_html  # noqa: E402
+
+SHIPPED_CSV = os.path.join(REPO_ROOT, 'June2024_Full_City.csv')
+SYNTHETIC_SIZES = {'full': (2000, 720, 600), 'quick': (500, 600, 500)}
+
+
+def write_synthetic_csv(path, series, months, seed=0):
+    """Write a wide price CSV of random-walk prices shaped like the shipped files.
+
+    Dates are monthly from January 1970 in the four-digit-year format, headers
+    are "APU0000S00001 - Synthetic item 1" style, and a tenth of the series
+    only start partway through, like Yogurt and Butter do in the real data.
+    """
+    rng = np.random.default_rng(seed)
+    log_prices = np.log(rng.uniform(0.5, 20.0, series)) + np.cumsum(rng.normal(0.002, 0.02, (months, series)), axis=0)
+    prices = np.round(np.exp(log_prices), 3)
+    late = rng.choice(series, series // 10, replace=False)
+    prices[:months // 3, late] = np.nan
+    dates = pd.date_range('1970-01-01', periods=months, freq='MS').strftime('%m/%d/%Y')
+    frame = pd.DataFrame(prices, columns=[f"APU0000S{n:05d} - Synthetic item {n}" for n in range(1, series + 1)])
+    frame.insert(0, 'Date', dates)
+    frame.to_csv(path, index=False)
+
+
+def build_cases(path, basket_size):
+    """Return {case name: zero-argument callable} for one price table."""
+    frame = read_price_csv(path)
+    dataset = PriceDataset(frame)
+    rng = np.random.default_rng(1)
+    items = [dataset.items[position] for position in rng.choice(len(dataset.items), basket_size, replace=False)]
+    amounts = rng.integers(1, 12, basket_size).tolist()
+    base, comparison = dataset.periods[0], dataset.latest_period
+    june_years = sorted({year for year, month in dataset.periods if month == 6})
+
+    engine = BasketSeriesEngine(dataset)
+    cube = LogPriceCube(dataset)
+    catalog = CatalogIndex(dataset)
+    # Typeahead queries as typed: prefixes, a misspelling, several words and a series code
+    queries = ['ch', 'chick', 'chiken', 'milk gal', 'synthetic item 12', 'apu0000s001', '7081']
+    total_cost_df = engine._compute_series(items, amounts)
+    result = calculate_inflation(items, amounts, base, comparison, dataset)
+    base_label, comparison_label = format_period(base), format_period(comparison)
+    basket = BasketState(dataset).update(items, amounts)
+    # Many fixed baskets at once, and a few whose quantities drift month to month (where the formulas differ)
+    fixed_baskets = rng.integers(0, 12, (64, basket_size)).astype(np.float64)
+    varying_baskets = rng.uniform(0, 12, (8, len(dataset.periods), basket_size))
+
+    def basket_edit():
+        # Rescale one line back and forth, then read the summary as the app does after an edit
+        basket.set(items[0], basket.quantities[0] % 11 + 1)
+        return basket.summary(base, comparison)
+
+    return {
+        'load_csv': lambda: read_price_csv(path),
+        'build_dataset': lambda: PriceDataset(frame),
+        'get_june_data': lambda: [get_june_data(year, dataset) for year in june_years],
+        'calculate_inflation': lambda: calculate_inflation(items, amounts, base, comparison, dataset),
+        'series_engine_setup': lambda: BasketSeriesEngine(dataset),
+        'plot_series': lambda: engine._compute_series(items, amounts),
+        'log_cube_setup': lambda: LogPriceCube(dataset),
+        'item_changes': lambda: cube.item_changes(base, comparison),
+        'basket_edit_one_line': basket_edit,
+        'basket_month_matrix': lambda: cube.basket_index(items, amounts).matrix(),
+        'chained_index_64_baskets': lambda: chained_index_batch(dataset, items, fixed_baskets),
+        'chained_index_varying_8_baskets': lambda: chained_index_batch(dataset, items, varying_baskets),
+        'chained_index_contributions': lambda: chained_index_batch(dataset, items, amounts, contributions=True),
+        'projection_10000_paths_60_months': lambda: simulate_costs(
+            fit_projection(dataset, items, amounts), horizon_months=60, paths=10_000, seed=0),
+        'catalog_index_setup': lambda: CatalogIndex(dataset),
+        'catalog_search': lambda: [catalog.search(query) for query in queries],
+        'chart_spec': lambda: build_total_cost_chart(total_cost_df).to_dict(),
+        'item_table_html': lambda: item_table_html(result, base_label, comparison_label),
+    }
+
+
+def time_case(function, repeat, min_seconds):
+    """Time function like timeit: calls per sample grow until a sample takes min_seconds."""
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_seconds:
+            break
+        number *= 10 if elapsed < min_seconds / 10 else 2
+    samples = [elapsed / number] + [timer.timeit(number) / number for _ in range(repeat - 1)]
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'number': number, 'repeat': repeat}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(quick=False, repeat=5, min_seconds=0.05, only=None):
+    """Run every case on every workload and return the results document."""
+    series, months, basket_size = SYNTHETIC_SIZES['quick' if quick else 'full']
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic_path = os.path.join(directory, 'synthetic.csv')
+        write_synthetic_csv(synthetic_path, series, months)
+        workloads = {
+            'shipped': (SHIPPED_CSV, 20),
+            f'synthetic_{series}x{months}': (synthetic_path, basket_size),
+        }
+        for workload, (path, size) in workloads.items():
+            for case, function in build_cases(path, size).items():
+                name = f"{workload}/{case}"
+                if only and only not in name:
+                    continue
+                results[name] = time_case(function, repeat, min_seconds)
+                print(f"{name:50s} {results[name]['median_s'] * 1000:10.3f} ms", flush=True)
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, candidate, threshold):
+    """Return (rows, regressions) comparing the median times of two results documents."""
+    rows, regressions = [], []
+    for name, result in candidate['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            rows.append((name, None, result['median_s'], None))
+            continue
+        ratio = result['median_s'] / before['median_s']
+        rows.append((name, before['median_s'], result['median_s'], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the suite and write results as JSON')
+    run_parser.add_argument('-o', '--output', help='results file (default: print only)')
+    run_parser.add_argument('--quick', action='store_true', help='use a smaller synthetic table')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--min-seconds', type=float, default=0.05, help='minimum duration of one sample')
+    run_parser.add_argument('--only', help='run only cases whose name contains this text')
+    compare_parser = commands.add_parser('compare', help='flag regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help='allowed slowdown as a fraction of the baseline (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        document = run(args.quick, args.repeat, args.min_seconds, args.only)
+        if args.output:
+            with open(args.output, 'w') as handle:
+                json.dump(document, handle, indent=2)
+        return 0
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.candidate) as handle:
+        candidate = json.load(handle)
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    for name, before, after, ratio in rows:
+        if ratio is None:
+            print(f"{name:50s} {'new':>10s} {after * 1000:10.3f} ms")
+            continue
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:50s} {before * 1000:10.3f} -> {after * 1000:10.3f} ms  x{ratio:.2f}{flag}")
+    if regressions:
+        print(f"FAIL: {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
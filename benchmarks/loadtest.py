@@ -0,0 +1,128 @@
+"""Load test for the inflation HTTP service.
+
+Starts ``python -m inflation_core.service`` on a free local port (or targets
+--host/--port if given), drives it with concurrent keep-alive clients posting
+random baskets, and reports p50/p99 latency and requests per second. A share
+of the requests repeat a small set of hot baskets so coalescing is exercised.
+
+    python benchmarks/loadtest.py --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+PERIOD_PAIRS = [('2019-06', '2024-06'), ('2014-06', '2024-06'), ('2021-01', '2024-05')]
+
+
+def make_payloads(items, count, basket_size, hot_share, seed):
+    rng = random.Random(seed)
+
+    def random_payload():
+        basket = rng.sample(items, min(basket_size, len(items)))
+        base, comparison = rng.choice(PERIOD_PAIRS)
+        return {'items': basket, 'quantities': [rng.randint(1, 12) for _ in basket],
+                'base': base, 'comparison': comparison}
+
+    hot = [random_payload() for _ in range(8)]
+    return [rng.choice(hot) if rng.random() < hot_share else random_payload() for _ in range(count)]
+
+
+async def client(host, port, payloads, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for payload in payloads:
+            body = json.dumps(payload).encode('utf-8')
+            request = (
+                f"POST /inflation HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode('latin-1') + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if b' 200 ' not in status_line:
+                raise RuntimeError(f"unexpected response: {status_line!r}")
+    finally:
+        writer.close()
+
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+
+async def run_load(host, port, payloads, concurrency):
+    latencies = []
+    shares = [payloads[index::concurrency] for index in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, share, latencies) for share in shares if share))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed, await fetch_stats(host, port)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='target an already running service instead of starting one')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--basket-size', type=int, default=20)
+    parser.add_argument('--hot-share', type=float, default=0.3, help='fraction of requests for repeated baskets')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from inflation_core import load_dataset
+
+    payloads = make_payloads(load_dataset().items, args.requests, args.basket_size, args.hot_share, args.seed)
+    server = None
+    port = args.port
+    if port is None:
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'inflation_core.service', '--host', args.host, '--port', '0'],
+            cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True,
+        )
+        port = int(server.stdout.readline().rsplit(':', 1)[1])
+    try:
+        latencies, elapsed, stats = asyncio.run(run_load(args.host, port, payloads, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"requests:    {len(latencies)} over {elapsed:.2f} s with {args.concurrency} clients")
+    print(f"throughput:  {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"latency p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"mean:        {statistics.mean(latencies) * 1000:.2f} ms")
+    print(f"server:      {stats}")
+
+
+if __name__ == '__main__':
+    main()
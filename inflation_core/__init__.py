@@ -0,0 +1,98 @@
+"""Data access and inflation math shared by the Streamlit app and batch tools.
+
+Nothing here depends on Streamlit or Altair. Names are resolved lazily: the
+package itself imports no submodules, so ``import inflation_core`` stays cheap
+and pandas, NumPy and the price table are only loaded by the first call that
+needs them.
+"""
+import importlib
+
+_EXPORTS = {
+    'AreaPriceArray': 'areas',
+    'area_codes': 'areas',
+    'area_name': 'areas',
+    'area_prices': 'areas',
+    'calculate_inflation_areas': 'areas',
+    'rank_areas': 'areas',
+    'AvailabilityBitmap': 'availability',
+    'BasketState': 'basket',
+    'availability_bitmap': 'availability',
+    'build_catalog': 'bls',
+    'ingest_bls': 'bls',
+    'ResultCache': 'cache',
+    'cached_citation': 'cache',
+    'cached_inflation': 'cache',
+    'result_cache': 'cache',
+    'AREA_NAMES': 'catalog',
+    'area_series_id': 'catalog',
+    'generate_citation': 'catalog',
+    'goods_to_series_id': 'catalog',
+    'series_id_for_column': 'catalog',
+    'series_id_to_goods': 'catalog',
+    'split_series_header': 'catalog',
+    'split_series_id': 'catalog',
+    'GAP_METHODS': 'dataset',
+    'PriceDataset': 'dataset',
+    'fill_gaps': 'dataset',
+    'format_period': 'dataset',
+    'normalize_period': 'dataset',
+    'calculate_inflation': 'inflation',
+    'calculate_inflation_batch': 'inflation',
+    'calculate_percentage_change': 'inflation',
+    'get_june_data': 'inflation',
+    'inflation_summary': 'inflation',
+    'percentage_change_array': 'inflation',
+    'chained_index': 'indexes',
+    'chained_index_batch': 'indexes',
+    'index_contributions': 'indexes',
+    'DEFAULT_DATA_PATH': 'loader',
+    'cache_stats': 'loader',
+    'clear_cache': 'loader',
+    'load_dataset': 'loader',
+    'load_price_table': 'loader',
+    'InflationResult': 'results',
+    'InflationSummary': 'results',
+    'ItemBlock': 'results',
+    'CatalogIndex': 'search',
+    'catalog_index': 'search',
+    'PriceSnapshot': 'snapshot',
+    'StaleSnapshotError': 'snapshot',
+    'compile_snapshot': 'snapshot',
+    'open_snapshot': 'snapshot',
+    'snapshot_path_for': 'snapshot',
+    'BasketIndex': 'cube',
+    'LogPriceCube': 'cube',
+    'log_price_cube': 'cube',
+    'BasketSeriesEngine': 'series',
+    'basket_cost_matrix': 'series',
+    'basket_cost_series': 'series',
+    'series_engine': 'series',
+    'ProjectionModel': 'projection',
+    'fit_projection': 'projection',
+    'project_basket_cost': 'projection',
+    'simulate_costs': 'projection',
+    'SharedPriceTable': 'shared',
+    'attach': 'shared',
+    'publish': 'shared',
+    'PriceStore': 'store',
+    'month_code': 'store',
+    'file_digest': 'sources',
+    'read_price_csv': 'sources',
+    'Profiler': 'profiling',
+    'profiler': 'profiling',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,137 @@
+"""Prices by BLS area as one float32 (areas, months, item codes) array, so a basket is priced in every area at once."""
+import numpy as np
+import pandas as pd
+
+from .catalog import AREA_NAMES, NATIONAL_AREA_CODE, split_series_id
+from .inflation import _basket_totals, percentage_change_array
+
+PRICE_DTYPE = np.float32
+
+
+class AreaPriceArray:
+    """The prices of one PriceDataset indexed by (area, month, item code)."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        parsed = [split_series_id(series_id) for series_id in dataset.series_ids]
+        columns = [position for position, codes in enumerate(parsed) if codes is not None]
+        self.areas = area_codes(dataset)
+        self.item_codes = list(dict.fromkeys(parsed[position][1] for position in columns))
+        self._area_row = {code: row for row, code in enumerate(self.areas)}
+        self._item_column = {code: column for column, code in enumerate(self.item_codes)}
+
+        area_rows = np.array([self._area_row[parsed[position][0]] for position in columns], dtype=np.intp)
+        item_columns = np.array([self._item_column[parsed[position][1]] for position in columns], dtype=np.intp)
+        self.prices = np.full((len(self.areas), len(dataset.prices), len(self.item_codes)), np.nan, dtype=PRICE_DTYPE)
+        self.prices[area_rows, :, item_columns] = dataset.prices[:, columns].T
+        self.observed = ~np.isnan(self.prices)
+
+        # Label each item code with its national column's label where there is one
+        self.item_labels = {}
+        for position in sorted(columns, key=lambda position: parsed[position][0] != NATIONAL_AREA_CODE):
+            self.item_labels.setdefault(parsed[position][1], dataset.items[position])
+
+    def area_name(self, code):
+        return area_name(self.dataset, code)
+
+    def item_columns(self, items):
+        """Return the item-code column of each item (label, series ID or bare item code), or -1."""
+        positions = self.dataset.item_positions(items)
+        columns = []
+        for item, position in zip(items, positions):
+            codes = split_series_id(self.dataset.series_ids[position] if position >= 0 else item)
+            code = codes[1] if codes is not None else item
+            columns.append(self._item_column.get(code, -1))
+        return np.array(columns, dtype=np.intp)
+
+    def area_rows(self, areas=None):
+        """Return the rows for a list of area codes (all areas when None); unknown codes raise KeyError."""
+        if areas is None:
+            return np.arange(len(self.areas))
+        return np.array([self._area_row[code] for code in areas], dtype=np.intp)
+
+    def period_prices(self, period, areas=None):
+        """Return the (areas, item codes) float32 price slice for one month; NaN where unpriced."""
+        row = self.dataset.period_row(period)
+        rows = self.area_rows(areas)
+        if row is None:
+            return np.full((len(rows), len(self.item_codes)), np.nan, dtype=PRICE_DTYPE)
+        return self.prices[rows, row]
+
+    def inflation(self, items, quantities, base_period, comparison_period, areas=None):
+        """Price one or more baskets in every area (or the given area codes) at once.
+
+        quantities is baskets-by-items, or one basket as a 1-D sequence.
+        Returns a dict like calculate_inflation_batch's, with an 'areas'
+        axis in place of period pairs: per-item prices are (areas, items)
+        and totals, differences and percentage changes are (baskets, areas).
+        A total is NaN where the area lacks a price for an item the basket holds.
+        """
+        quantities = np.atleast_2d(np.asarray(quantities, dtype=np.float64))
+        columns = self.item_columns(items)
+        included = columns >= 0
+        area_codes = self.areas if areas is None else list(areas)
+        base_prices = np.full((len(area_codes), len(items)), np.nan)
+        comparison_prices = np.full((len(area_codes), len(items)), np.nan)
+        base_prices[:, included] = self.period_prices(base_period, area_codes)[:, columns[included]]
+        comparison_prices[:, included] = self.period_prices(comparison_period, area_codes)[:, columns[included]]
+
+        counted = quantities[:, included]
+        total_base_cost = _basket_totals(counted, base_prices[:, included])
+        total_comparison_cost = _basket_totals(counted, comparison_prices[:, included])
+        return {
+            'areas': area_codes,
+            'items': list(items),
+            'included': included,
+            'quantities': quantities,
+            'base_prices': base_prices,
+            'comparison_prices': comparison_prices,
+            'total_base_cost': total_base_cost,
+            'total_comparison_cost': total_comparison_cost,
+            'cost_difference': total_comparison_cost - total_base_cost,
+            'percentage_change': percentage_change_array(total_base_cost, total_comparison_cost),
+        }
+
+    def rank(self, items, quantities, base_period, comparison_period, areas=None):
+        """Rank areas by a basket's percentage change, highest first; areas it cannot be priced in come last."""
+        result = self.inflation(items, [quantities], base_period, comparison_period, areas)
+        frame = pd.DataFrame({
+            'area_code': result['areas'],
+            'area_name': [self.area_name(code) for code in result['areas']],
+            'total_base_cost': result['total_base_cost'][0],
+            'total_comparison_cost': result['total_comparison_cost'][0],
+            'cost_difference': result['cost_difference'][0],
+            'percentage_change': result['percentage_change'][0],
+        })
+        frame = frame.sort_values('percentage_change', ascending=False, na_position='last', kind='stable')
+        frame.insert(0, 'rank', np.arange(1, len(frame) + 1))
+        return frame.reset_index(drop=True)
+
+
+def _area_codes(dataset):
+    codes = {codes[0] for codes in map(split_series_id, dataset.series_ids) if codes is not None}
+    return sorted(codes, key=lambda code: (code != NATIONAL_AREA_CODE, code))
+
+
+def area_codes(dataset):
+    """Return the dataset's BLS area codes, national first, without building its AreaPriceArray."""
+    return dataset.derived('area_codes', _area_codes)
+
+
+def area_name(dataset, code):
+    return dataset.area_names.get(code) or AREA_NAMES.get(code) or code
+
+
+def area_prices(dataset):
+    """Return the dataset's AreaPriceArray."""
+    return dataset.derived('area_prices', AreaPriceArray)
+
+
+def calculate_inflation_areas(dataset, items, quantities, base_period, comparison_period, areas=None):
+    """Price baskets in every area at once; see AreaPriceArray.inflation."""
+    return area_prices(dataset).inflation(items, quantities, base_period, comparison_period, areas)
+
+
+def rank_areas(dataset, items, quantities, base_period, comparison_period, areas=None):
+    """Rank areas by a basket's inflation; see AreaPriceArray.rank."""
+    return area_prices(dataset).rank(items, quantities, base_period, comparison_period, areas)
@@ -0,0 +1,68 @@
+"""Which items have prices in which months, as a packed month-by-item bitmap."""
+import numpy as np
+
+from .dataset import normalize_period
+
+
+class AvailabilityBitmap:
+    """Packed months-by-items availability for one PriceDataset."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.periods = list(dataset.period_index)
+        self._order = {period: position for position, period in enumerate(self.periods)}
+        rows = np.fromiter(dataset.period_index.values(), dtype=np.intp, count=len(self.periods))
+        self.bits = np.packbits(~np.isnan(dataset.prices[rows]), axis=1)
+        self._labels = np.array(dataset.items, dtype=object)
+
+    def _position(self, period):
+        return self._order.get(normalize_period(period))
+
+    def _empty(self):
+        return np.zeros(self.bits.shape[1], dtype=np.uint8)
+
+    def period_bits(self, period):
+        """Return the packed availability row for one month (all zero if the month is missing)."""
+        position = self._position(period)
+        return self._empty() if position is None else self.bits[position]
+
+    def range_bits(self, start, end, continuous=True):
+        """Combine the rows from start to end inclusive.
+
+        With continuous=True an item's bit is set only if it has a price in
+        every month of the range (AND); otherwise in at least one (OR).
+        """
+        first, last = self._position(start), self._position(end)
+        if first is None or last is None or first > last:
+            return self._empty()
+        reduce = np.bitwise_and if continuous else np.bitwise_or
+        return reduce.reduce(self.bits[first:last + 1], axis=0)
+
+    def mask(self, bits):
+        """Unpack bits into a boolean mask over dataset.items."""
+        return np.unpackbits(bits, count=len(self._labels)).astype(bool)
+
+    def decode(self, bits):
+        """Return the item labels whose bits are set."""
+        return self._labels[self.mask(bits)].tolist()
+
+    def items_for(self, period):
+        """Return the items priced in one month."""
+        return self.decode(self.period_bits(period))
+
+    def items_in_both(self, base_period, comparison_period):
+        """Return the items priced in both months, i.e. the ones a comparison can use."""
+        return self.decode(self.period_bits(base_period) & self.period_bits(comparison_period))
+
+    def mask_in_both(self, base_period, comparison_period):
+        """Return items_in_both as a boolean mask over dataset.items."""
+        return self.mask(self.period_bits(base_period) & self.period_bits(comparison_period))
+
+    def items_covering(self, start, end):
+        """Return the items priced in every month from start to end."""
+        return self.decode(self.range_bits(start, end))
+
+
+def availability_bitmap(dataset):
+    """Return the dataset's AvailabilityBitmap."""
+    return dataset.derived('availability', AvailabilityBitmap)
@@ -0,0 +1,149 @@
+"""One basket's monthly totals, kept current by adding or subtracting a line's price column as it changes."""
+import numpy as np
+import pandas as pd
+
+from .cache import inflation_key, result_cache
+from .inflation import percentage_change_array
+from .results import InflationResult, InflationSummary, ItemBlock
+from .series import series_engine
+
+# Running sums drift from a single matrix product, so they are recomputed from scratch this often
+RESYNC_EDITS = 1024
+
+
+class BasketState:
+    """A basket over one dataset (and optionally one BLS area) with incrementally maintained totals."""
+
+    def __init__(self, dataset, area=None):
+        self.dataset = dataset
+        self.area = area
+        self.engine = series_engine(dataset)
+        months = len(dataset.prices)
+        self.costs = np.zeros(months)
+        self.gap_counts = np.zeros(months)
+        self.filled_counts = np.zeros(months)
+        self.held = 0
+        self.edits = 0
+        self._lines = {}
+
+    @property
+    def items(self):
+        return list(self._lines)
+
+    @property
+    def quantities(self):
+        return [quantity for _, quantity in self._lines.values()]
+
+    def _position(self, item):
+        lookup = item if self.area is None else self.dataset.items_in_area([item], self.area)[0]
+        return int(self.dataset.item_positions([lookup])[0])
+
+    def _apply(self, position, old, new):
+        if position < 0 or old == new:
+            return
+        self.costs += (new - old) * self.engine.filled_prices[:, position]
+        held_change = (new != 0) - (old != 0)
+        if held_change:
+            self.held += held_change
+            self.gap_counts += held_change * self.engine.gap_matrix[:, position]
+            if self.engine.filled_matrix is not None:
+                self.filled_counts += held_change * self.engine.filled_matrix[:, position]
+        if not self.held:
+            # An empty basket costs exactly nothing, not the running sums' leftover rounding
+            self.costs[:] = 0.0
+        self.edits += 1
+        if self.edits >= RESYNC_EDITS:
+            self.resync()
+
+    def set(self, item, quantity):
+        """Add a line, or change its quantity; O(months)."""
+        position, old = self._lines.get(item, (None, 0.0))
+        if position is None:
+            position = self._position(item)
+        quantity = float(quantity)
+        self._lines[item] = (position, quantity)
+        self._apply(position, old, quantity)
+
+    def remove(self, item):
+        """Drop a line; O(months). Unknown items are ignored."""
+        line = self._lines.pop(item, None)
+        if line is not None:
+            self._apply(line[0], line[1], 0.0)
+
+    def update(self, items, quantities):
+        """Make the basket exactly items with quantities, applying only the lines that changed."""
+        wanted = {}
+        for item, quantity in zip(items, quantities):
+            wanted[item] = wanted.get(item, 0.0) + float(quantity)
+        for item in [item for item in self._lines if item not in wanted]:
+            self.remove(item)
+        for item, quantity in wanted.items():
+            if self._lines.get(item, (None, None))[1] != quantity:
+                self.set(item, quantity)
+        self._lines = {item: self._lines[item] for item in wanted}
+        return self
+
+    def resync(self):
+        """Recompute the running arrays from the current lines in one pass."""
+        weights = np.zeros(len(self.dataset.items))
+        for position, quantity in self._lines.values():
+            if position >= 0:
+                weights[position] += quantity
+        held = (weights != 0).astype(np.float32)
+        self.costs = self.engine.filled_prices @ weights
+        self.gap_counts = (self.engine.gap_matrix @ held).astype(np.float64)
+        if self.engine.filled_matrix is not None:
+            self.filled_counts = (self.engine.filled_matrix @ held).astype(np.float64)
+        self.held = sum(1 for position, quantity in self._lines.values() if position >= 0 and quantity != 0)
+        self.edits = 0
+
+    @property
+    def complete(self):
+        """Months in which every held item has a price."""
+        return (self.gap_counts == 0) & self.engine.dated
+
+    def total(self, period):
+        """Return the basket's total cost in a period, NaN if a held item has no price there; O(1)."""
+        row = self.dataset.period_row(period)
+        if row is None:
+            return np.nan if self.held else 0.0
+        return self.costs[row] if self.gap_counts[row] == 0 else np.nan
+
+    def summary(self, base_period, comparison_period):
+        """Return the InflationSummary for two periods without touching the lines; O(1)."""
+        base, comparison = self.total(base_period), self.total(comparison_period)
+        return InflationSummary(base, comparison, comparison - base, percentage_change_array(base, comparison))
+
+    def result(self, base_period, comparison_period):
+        """Return what calculate_inflation would for the basket, through result_cache; O(items)."""
+        if self.dataset.version is None:
+            return self._result(base_period, comparison_period)
+        key = inflation_key(self.dataset, self.items, self.quantities, base_period, comparison_period, self.area)
+        return result_cache.get_or_compute(key, lambda: self._result(base_period, comparison_period))
+
+    def _result(self, base_period, comparison_period):
+        known = [(item, position, quantity) for item, (position, quantity) in self._lines.items() if position >= 0]
+        positions = np.array([position for _, position, _ in known], dtype=np.intp)
+        prices = []
+        for period in (base_period, comparison_period):
+            row = self.dataset.period_row(period)
+            prices.append(np.full(len(positions), np.nan) if row is None else self.dataset.prices[row, positions])
+        items = ItemBlock([item for item, _, _ in known], [quantity for _, _, quantity in known], *prices)
+        return InflationResult(self.summary(base_period, comparison_period), items)
+
+    def series(self):
+        """Return the 'Date'/'TotalCost'/'Filled' frame of basket_cost_series, through result_cache; O(months)."""
+        if self.dataset.version is None:
+            return self._series()
+        lines = [(self.dataset.items[position], quantity) for position, quantity in self._lines.values() if position >= 0]
+        key = ('series', self.dataset.version, self.dataset.basket_key([item for item, _ in lines],
+                                                                        [quantity for _, quantity in lines]))
+        return result_cache.get_or_compute(key, self._series)
+
+    def _series(self):
+        complete = self.complete
+        return pd.DataFrame({
+            'Date': self.dataset.dates.to_numpy()[complete],
+            'TotalCost': self.costs[complete],
+            'Filled': self.filled_counts[complete] > 0,
+        })
@@ -0,0 +1,240 @@
+"""Score basket files from the command line, one summary row per basket, period pair and (with --by-area) area.
+
+Input is a long-format CSV, one row per basket line, rows of a basket contiguous::
+
+    basket_id,item,quantity
+    1001,Eggs - doz.,2
+    1001,APU0000709112,1
+
+Workers share a compiled snapshot's mapped prices, but fill gaps into private
+copies; point --data at a published directory (see shared.py) to share those too.
+
+    python -m inflation_core.batch baskets.csv -o results.csv --pair 2019-06:2024-06 --workers 8
+"""
+import argparse
+import collections
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .areas import calculate_inflation_areas
+from .dataset import DEFAULT_GAP_METHOD, GAP_METHODS, normalize_period
+from .indexes import chained_index_batch
+from .inflation import calculate_inflation_batch
+from .loader import DEFAULT_DATA_PATH, load_dataset
+
+INPUT_COLUMNS = ['basket_id', 'item', 'quantity']
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def parse_pair(text):
+    """Parse 'YYYY-MM:YYYY-MM' into a pair of (year, month) periods; a bare year means June."""
+    base, separator, comparison = text.partition(':')
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected BASE:COMPARISON, got {text!r}")
+    try:
+        return normalize_period(base.strip()), normalize_period(comparison.strip())
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
+def _period_code(period):
+    return f"{period[0]:04d}-{period[1]:02d}"
+
+
+def _basket_quantities(rows):
+    basket_codes, basket_ids = pd.factorize(rows['basket_id'], sort=False)
+    item_codes, items = pd.factorize(rows['item'].astype(str), sort=False)
+    quantities = np.zeros((len(basket_ids), len(items)))
+    np.add.at(quantities, (basket_codes, item_codes), rows['quantity'].to_numpy(dtype=np.float64))
+    return basket_ids, list(items), quantities
+
+
+def _chained_changes(dataset, items, quantities, period_pairs):
+    """Return the baskets x pairs percentage change of each basket's chained Fisher index."""
+    result = chained_index_batch(dataset, items, quantities, formulas=['fisher'])
+    index = result['fisher']['index']
+    columns = {period: column for column, period in enumerate(result['periods'])}
+    changes = np.full((len(quantities), len(period_pairs)), np.nan)
+    for pair, (base, comparison) in enumerate(period_pairs):
+        if base in columns and comparison in columns:
+            changes[:, pair] = (index[:, columns[comparison]] / index[:, columns[base]] - 1) * 100
+    return changes
+
+
+def score_baskets(rows, period_pairs, dataset, by_area=False, chained=False):
+    """Price a long-format frame of basket rows at every period pair.
+
+    Returns one row per basket and pair with the basket totals, difference,
+    percentage change and the number of basket items the table does not carry.
+    With chained, a chained_change column holds the percentage change of the
+    basket's chained index between the pair's periods (NaN where either
+    period has no prices). With by_area, see score_baskets_by_area.
+    """
+    if by_area:
+        if chained:
+            raise ValueError("chained index changes are not available by area")
+        return score_baskets_by_area(rows, period_pairs, dataset)
+    basket_ids, items, quantities = _basket_quantities(rows)
+    batch = calculate_inflation_batch(dataset, items, quantities, period_pairs)
+    unmatched = np.count_nonzero(quantities[:, ~batch['included']], axis=1)
+    pair_count = len(period_pairs)
+    frame = pd.DataFrame({
+        'basket_id': np.repeat(np.asarray(basket_ids), pair_count),
+        'base_period': np.tile([_period_code(base) for base, _ in period_pairs], len(basket_ids)),
+        'comparison_period': np.tile([_period_code(comparison) for _, comparison in period_pairs], len(basket_ids)),
+        'total_base_cost': batch['total_base_cost'].ravel(),
+        'total_comparison_cost': batch['total_comparison_cost'].ravel(),
+        'cost_difference': batch['cost_difference'].ravel(),
+        'percentage_change': batch['percentage_change'].ravel(),
+        'unmatched_items': np.repeat(unmatched, pair_count),
+    })
+    if chained:
+        frame['chained_change'] = _chained_changes(dataset, items, quantities, period_pairs).ravel()
+    return frame
+
+
+def score_baskets_by_area(rows, period_pairs, dataset):
+    """Price a long-format frame of basket rows in every area at every period pair.
+
+    Returns one row per basket, pair and area code, with the same columns as
+    score_baskets plus area_code; each pair prices all areas in one call.
+    """
+    basket_ids, items, quantities = _basket_quantities(rows)
+    frames = []
+    for base, comparison in period_pairs:
+        result = calculate_inflation_areas(dataset, items, quantities, base, comparison)
+        unmatched = np.count_nonzero(quantities[:, ~result['included']], axis=1)
+        area_count = len(result['areas'])
+        frames.append(pd.DataFrame({
+            'basket_id': np.repeat(np.asarray(basket_ids), area_count),
+            'area_code': np.tile(result['areas'], len(basket_ids)),
+            'base_period': _period_code(base),
+            'comparison_period': _period_code(comparison),
+            'total_base_cost': result['total_base_cost'].ravel(),
+            'total_comparison_cost': result['total_comparison_cost'].ravel(),
+            'cost_difference': result['cost_difference'].ravel(),
+            'percentage_change': result['percentage_change'].ravel(),
+            'unmatched_items': np.repeat(unmatched, area_count),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _init_worker(data_path, gap_method):
+    load_dataset(data_path, gap_method)
+
+
+def _score_chunk(rows, period_pairs, data_path, gap_method, by_area, chained):
+    return score_baskets(rows, period_pairs, load_dataset(data_path, gap_method), by_area, chained)
+
+
+def iter_basket_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream the input file as frames that never split a basket across two chunks."""
+    carry = None
+    for chunk in pd.read_csv(path, usecols=INPUT_COLUMNS, chunksize=chunk_rows):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        last_basket = chunk['basket_id'].iloc[-1]
+        is_last = (chunk['basket_id'] == last_basket).to_numpy()
+        carry = chunk[is_last]
+        if not is_last.all():
+            yield chunk[~is_last]
+    if carry is not None and len(carry):
+        yield carry
+
+
+class ResultWriter:
+    """Append result frames to a CSV or Parquet file as they arrive."""
+
+    def __init__(self, path, output_format=None):
+        self.path = path
+        self.format = output_format or ('parquet' if path.endswith('.parquet') else 'csv')
+        self.rows = 0
+        self._parquet_writer = None
+        self._csv_handle = None
+
+    def write(self, frame):
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            if self._csv_handle is None:
+                self._csv_handle = open(self.path, 'w', newline='')
+                frame.to_csv(self._csv_handle, index=False)
+            else:
+                frame.to_csv(self._csv_handle, index=False, header=False)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._csv_handle is not None:
+            self._csv_handle.close()
+
+
+def run_batch(input_path, output_path, period_pairs, data_path=DEFAULT_DATA_PATH, workers=None,
+              chunk_rows=DEFAULT_CHUNK_ROWS, output_format=None, by_area=False, gap_method=DEFAULT_GAP_METHOD,
+              chained=False):
+    """Score every basket in input_path and write the results; returns the number of rows written.
+
+    At most two chunks per worker are in flight, and results are written in
+    input order as they complete.
+    """
+    workers = workers or os.cpu_count() or 1
+    dataset = load_dataset(data_path, gap_method)
+    writer = ResultWriter(output_path, output_format)
+    try:
+        if workers == 1:
+            for rows in iter_basket_chunks(input_path, chunk_rows):
+                writer.write(score_baskets(rows, period_pairs, dataset, by_area, chained))
+            return writer.rows
+
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(data_path, gap_method)) as pool:
+            pending = collections.deque()
+            for rows in iter_basket_chunks(input_path, chunk_rows):
+                pending.append(pool.apply_async(_score_chunk, (rows, period_pairs, data_path, gap_method, by_area, chained)))
+                if len(pending) >= 2 * workers:
+                    writer.write(pending.popleft().get())
+            while pending:
+                writer.write(pending.popleft().get())
+        return writer.rows
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Price a file of baskets against the BLS average price table.')
+    parser.add_argument('input', help='long-format CSV with basket_id, item and quantity columns')
+    parser.add_argument('-o', '--output', required=True, help='output path (.csv or .parquet)')
+    parser.add_argument('--pair', dest='pairs', action='append', type=parse_pair, required=True,
+                        metavar='BASE:COMPARISON', help="period pair such as 2019-06:2024-06; may be repeated")
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH,
+                        help='price table CSV, PriceStore or published directory (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='input rows per chunk')
+    parser.add_argument('--format', choices=['csv', 'parquet'], help='output format (default: from extension)')
+    parser.add_argument('--gaps', choices=GAP_METHODS, default=DEFAULT_GAP_METHOD,
+                        help='how missing prices are filled before pricing (default: %(default)s)')
+    parser.add_argument('--by-area', action='store_true', help='price every basket in every BLS area of the table')
+    parser.add_argument('--chained', action='store_true',
+                        help="add each basket's chained index change over the pair (not with --by-area)")
+    args = parser.parse_args(argv)
+    if args.chained and args.by_area:
+        parser.error('--chained cannot be combined with --by-area')
+
+    rows = run_batch(args.input, args.output, args.pairs, data_path=args.data, workers=args.workers,
+                     chunk_rows=args.chunk_rows, output_format=args.format, by_area=args.by_area, gap_method=args.gaps,
+                     chained=args.chained)
+    print(f"wrote {rows} result rows to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Ingest local copies of the raw BLS Average Price (AP) flat files into a PriceStore, offline.
+
+The files (https://download.bls.gov/pub/time.series/ap/) are tab-separated with space-padded fields:
+
+    ap.series   series_id, area_code, item_code, series_title, ...
+    ap.item     item_code, item_name
+    ap.area     area_code, area_name
+    ap.data.*   series_id, year, period, value, footnote_codes
+
+    python -m inflation_core.bls prices_store path/to/bls_ap_files
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from .catalog import NATIONAL_AREA_CODE
+from .store import PriceStore
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def _read_table(path, **options):
+    return pd.read_csv(path, sep='\t', dtype=str, keep_default_na=False, **options).rename(columns=str.strip)
+
+
+def _stripped(frame):
+    return frame.apply(lambda column: column.str.strip())
+
+
+def read_mapping(path, key_column, value_column):
+    """Read a two-column code table such as ap.item or ap.area into a dict."""
+    frame = _stripped(_read_table(path, usecols=lambda column: column.strip() in (key_column, value_column)))
+    return dict(zip(frame[key_column], frame[value_column]))
+
+
+def build_catalog(directory):
+    """Build the series catalog from ap.series, ap.item and ap.area.
+
+    Returns {series_id: {'item_code', 'item_name', 'area_code', 'area_name',
+    'title', 'label'}}. label is the item name, with the area appended for
+    series that are not the U.S. city average.
+    """
+    items = read_mapping(os.path.join(directory, 'ap.item'), 'item_code', 'item_name')
+    areas = read_mapping(os.path.join(directory, 'ap.area'), 'area_code', 'area_name')
+    series = _stripped(_read_table(
+        os.path.join(directory, 'ap.series'),
+        usecols=lambda column: column.strip() in ('series_id', 'area_code', 'item_code', 'series_title'),
+    ))
+    catalog = {}
+    for series_id, area_code, item_code, title in zip(
+        series['series_id'], series['area_code'], series['item_code'], series['series_title']
+    ):
+        item_name = items.get(item_code, title)
+        area_name = areas.get(area_code, area_code)
+        label = item_name if area_code == NATIONAL_AREA_CODE else f"{item_name} ({area_name})"
+        catalog[series_id] = {
+            'item_code': item_code,
+            'item_name': item_name,
+            'area_code': area_code,
+            'area_name': area_name,
+            'title': title,
+            'label': label,
+        }
+    return catalog
+
+
+def iter_observations(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream an ap.data file as (month codes, series IDs, values) array chunks of monthly observations."""
+    for chunk in pd.read_csv(path, sep='\t', dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        chunk = chunk.rename(columns=str.strip)
+        period = chunk['period'].str.strip()
+        monthly = period.str.match(r'^M(0[1-9]|1[0-2])$').to_numpy()
+        if not monthly.any():
+            continue
+        months = period[monthly].str[1:].astype(int).to_numpy()
+        years = chunk['year'].str.strip()[monthly].astype(int).to_numpy()
+        values = pd.to_numeric(chunk['value'].str.strip()[monthly], errors='coerce').to_numpy(dtype=np.float64)
+        series_ids = chunk['series_id'].str.strip()[monthly].to_numpy()
+        yield years * 12 + months - 1, series_ids, values
+
+
+def ingest_bls(store, directory, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Load every ap.data.* file under directory into store and refresh its labels, descriptions and area names.
+
+    Returns a dict counting the monthly observations read, loaded and
+    skipped as already present (or without a value).
+    """
+    catalog = build_catalog(directory)
+    counts = {'read': 0, 'loaded': 0, 'skipped': 0}
+    for path in sorted(glob.glob(os.path.join(directory, 'ap.data.*'))):
+        for codes, series_ids, values in iter_observations(path, chunk_rows):
+            loaded = store.insert_records(codes.tolist(), series_ids.tolist(), values)
+            counts['read'] += len(values)
+            counts['loaded'] += loaded
+            counts['skipped'] += len(values) - loaded
+    for series_id in store.series_ids:
+        entry = catalog.get(series_id)
+        if entry is not None:
+            store.labels[series_id] = entry['label']
+            store.descriptions[series_id] = entry['title']
+            store.area_names[entry['area_code']] = entry['area_name']
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ingest raw BLS AP flat files into a price store.')
+    parser.add_argument('store', help='store directory (created if missing)')
+    parser.add_argument('directory', help='directory holding ap.series, ap.item, ap.area and ap.data.* files')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    exists = os.path.exists(os.path.join(args.store, 'catalog.json'))
+    store = PriceStore.open(args.store) if exists else PriceStore()
+    counts = ingest_bls(store, args.directory, args.chunk_rows)
+    store.save(args.store)
+    print(f"{args.store}: read {counts['read']}, loaded {counts['loaded']}, skipped {counts['skipped']}; "
+          f"{store.rows} months x {len(store.series_ids)} series")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Process-wide, size-bounded LRU memoization of basket results keyed by dataset version."""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .catalog import generate_citation
+from .dataset import normalize_period
+from .inflation import calculate_inflation
+from .results import InflationResult
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+def estimate_size(value):
+    """Roughly estimate the memory held by a cached value, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (np.ndarray, InflationResult)):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """A thread-safe LRU cache bounded by estimated size, with an optional TTL."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key, default=None):
+        """Return the cached value for key (counting a hit or miss), or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._remove(key)
+                self._counters['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counters['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store value under key, evicting least-recently-used entries to stay within max_bytes."""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters['evictions'] += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Cached values are shared between callers and must not be modified.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        """Return the hit, miss, eviction and expiration counters with the current size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for key in self._counters:
+                self._counters[key] = 0
+
+
+result_cache = ResultCache()
+
+
+def inflation_key(dataset, selected_items, amounts, base_period, comparison_period, area=None):
+    """Return the result_cache key of a basket's InflationResult (shared by cached_inflation and BasketState)."""
+    return ('inflation', dataset.version, dataset.basket_key(selected_items, amounts),
+            normalize_period(base_period), normalize_period(comparison_period), area)
+
+
+def cached_inflation(dataset, selected_items, amounts, base_period, comparison_period, area=None):
+    """calculate_inflation through result_cache.
+
+    Baskets with the same fingerprint share one entry, so the item labels of
+    the returned InflationResult are those of whichever call computed it first.
+    """
+    if dataset.version is None:
+        return calculate_inflation(selected_items, amounts, base_period, comparison_period, dataset, area)
+    key = inflation_key(dataset, selected_items, amounts, base_period, comparison_period, area)
+    return result_cache.get_or_compute(
+        key, lambda: calculate_inflation(selected_items, amounts, base_period, comparison_period, dataset, area)
+    )
+
+
+def cached_citation(selected_items, dataset=None):
+    """generate_citation through result_cache."""
+    key = ('citation', None if dataset is None else dataset.version, tuple(selected_items))
+    return result_cache.get_or_compute(key, lambda: generate_citation(selected_items, dataset))
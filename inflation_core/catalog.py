@@ -0,0 +1,134 @@
+"""Goods catalog: display labels and the BLS Average Price series behind them."""
+import re
+
+goods_to_series_id = {
+    "Eggs - doz.": "APU0000708111",
+    "Orange juice - 16 oz.": "APU0000713111",
+    "Gasoline, all types - gallon": "APU00007471A",
+    "Gasoline, regular - gallon": "APU000074714",
+    "Gasoline, premium - gallon": "APU000074716",
+    "Gasoline, midgrade - gallon": "APU000074715",
+    "Automotive diesel - gallon": "APU000074717",
+    "Sugar - lb.": "APU0000715211",
+    "Fuel oil #2 - gallon": "APU000072511",
+    "Chocolate Chip Cookies - lb.": "APU0000702421",
+    "All soft drinks, 12 pk - 12 oz.": "APU0000FN1102",
+    "Yogurt - 8 oz.": "APU0000FJ4101",
+    "Potato chips - 16 oz.": "APU0000718311",
+    "All soft drinks - 2 liters": "APU0000FN1101",
+    "All Ham - lb.": "APU0000FD2101",
+    "Coffee - lb.": "APU0000717311",
+    "Beef Steaks - lb.": "APU0000FC3101",
+    "Ground beef - lb.": "APU0000703112",
+    "Chuck roast - lb.": "APU0000703213",
+    "Electricity - KWH": "APU000072610",
+    "Flour - lb.": "APU0000701111",
+    "Round roast - lb.": "APU0000703311",
+    "White Bread - lb.": "APU0000702111",
+    "Beef Roasts - lb.": "APU0000FC2101",
+    "Steak, round - lb.": "APU0000703511",
+    "Wheat Bread - lb.": "APU0000702212",
+    "Steak, Sirloin - lb.": "APU0000703613",
+    "Chicken breast - lb.": "APU0000FF1101",
+    "Whole Chicken - lb.": "APU0000706111",
+    "White Rice - lb.": "APU0000701312",
+    "Butter - lb.": "APU0000FS1101",
+    "All Other Beef - lb.": "APU0000FC4101",
+    "All Other Pork - lb.": "APU0000FD4101",
+    "Ground chuck, 100% beef - lb.": "APU0000703111",
+    "All uncooked Ground beef - lb.": "APU0000FC1101",
+    "Potatoes - lb.": "APU0000712112",
+    "Ham - lb.": "APU0000704312",
+    "Utility (piped) gas - therm": "APU000072620",
+    "Beef for stew - lb.": "APU0000703432",
+    "Ground beef, extra lean - lb.": "APU0000703113",
+    "Ice cream - 1/2 gal.": "APU0000710411",
+    "All Pork Chops - lb.": "APU0000FD3101",
+    "Beans - lb.": "APU0000714233",
+    "Malt beverages - 16 oz.": "APU0000720111",
+    "Oranges - lb.": "APU0000711311",
+    "Bacon - lb.": "APU0000704111",
+    "Milk, low-fat - gal.": "APU0000FJ1101",
+    "Chops, center cut, bone-in - lb.": "APU0000704211",
+    "American processed cheese - lb.": "APU0000710211",
+    "Chicken legs, bone-in - lb.": "APU0000706212",
+    "Milk, whole - gal.": "APU0000709112",
+    "Chops, boneless - lb.": "APU0000704212",
+    "Wine - 1 liter": "APU0000720311",
+    "Spaghetti and macaroni - lb.": "APU0000701322",
+    "Bananas - lb.": "APU0000711211",
+    "Cheddar cheese - lb.": "APU0000710212",
+    "Tomatoes - lb.": "APU0000712311",
+    "Strawberries - 12 oz.": "APU0000711415"
+}
+
+series_id_to_goods = {series_id: item for item, series_id in goods_to_series_id.items()}
+
+NATIONAL_AREA_CODE = '0000'
+
+# Names of the BLS areas that appear across AP releases; ap.area has the full list
+AREA_NAMES = {
+    '0000': 'U.S. city average',
+    '0100': 'Northeast',
+    '0200': 'Midwest',
+    '0300': 'South',
+    '0400': 'West',
+}
+
+_SERIES_HEADER = re.compile(r'^\s*(AP[A-Z0-9]+)\s+-\s+(.*?)\s*$')
+_SERIES_ID = re.compile(r'^AP([A-Z])([A-Z0-9]{4})([A-Z0-9]+)$')
+
+
+def split_series_id(series_id):
+    """Split an Average Price series ID such as APU0100708111 into (area_code, item_code), or None."""
+    match = _SERIES_ID.match(series_id or '')
+    if match is None:
+        return None
+    return match.group(2), match.group(3)
+
+
+def area_series_id(series_id, area_code):
+    """Return the ID of the same item's series in another area, or None if series_id is not an AP series ID."""
+    match = _SERIES_ID.match(series_id or '')
+    if match is None:
+        return None
+    return f"AP{match.group(1)}{area_code}{match.group(3)}"
+
+
+def split_series_header(header):
+    """Split a "APU0000708111 - Eggs, grade A..." column header into (series_id, description).
+
+    Returns None for headers that do not start with a series ID, such as the
+    short labels used in test1.csv.
+    """
+    match = _SERIES_HEADER.match(header)
+    if match is None:
+        return None
+    return match.group(1), match.group(2)
+
+
+def series_id_for_column(header):
+    """Resolve a price column header of either style to its BLS series ID, or None if unknown."""
+    parsed = split_series_header(header)
+    if parsed is not None:
+        return parsed[0]
+    return goods_to_series_id.get(header)
+
+
+def generate_citation(selected_items, dataset=None):
+    """Build the BLS source citation for the selected items.
+
+    With a dataset, series IDs come from its own column catalog, so tables
+    built from the raw BLS files cite correctly without the curated labels.
+    """
+    if dataset is None:
+        series_ids = [goods_to_series_id[item] for item in selected_items if item in goods_to_series_id]
+    else:
+        positions = dataset.item_positions(selected_items)
+        series_ids = [dataset.series_ids[position] for position in positions if position >= 0 and dataset.series_ids[position]]
+    series_ids_str = ", ".join(series_ids)
+    citation = f"""
+    Source: U.S. Bureau of Labor Statistics, Average Price Data, Series {series_ids_str}, accessed July 15, 2024, 
+    <a href='https://download.bls.gov/pub/time.series/ap/ap.series' target='_blank' style='color: #222944 !important;'>https://download.bls.gov/pub/time.series/ap/ap.series</a>
+    """
+    return citation
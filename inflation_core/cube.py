@@ -0,0 +1,96 @@
+"""Inflation between any two months from cumulative log prices: exp(L[b] - L[a]) - 1 per item."""
+import numpy as np
+
+from .cache import result_cache
+from .inflation import calculate_percentage_change, percentage_change_array
+from .series import series_engine
+
+
+class BasketIndex:
+    """A basket's total cost in every month of a dataset, for constant-time changes between months."""
+
+    def __init__(self, dataset, costs):
+        self.dataset = dataset
+        self.costs = costs
+
+    def cost(self, period):
+        """Return the basket's total cost in a period; NaN if it has an unpriced item or the month is missing."""
+        row = self.dataset.period_row(period)
+        return np.nan if row is None else self.costs[row]
+
+    def change(self, start, end):
+        """Return the percentage change of the basket's cost from start to end."""
+        return calculate_percentage_change(float(self.cost(start)), float(self.cost(end)))
+
+    def matrix(self, periods=None):
+        """Return (changes, periods): changes[i, j] is the percentage change from periods[i] to periods[j].
+
+        periods defaults to every month with any price in the dataset.
+        """
+        periods = self.dataset.periods if periods is None else list(periods)
+        costs = np.array([self.cost(period) for period in periods])
+        return percentage_change_array(costs[:, None], costs[None, :]), periods
+
+
+class LogPriceCube:
+    """Per-item log prices for one PriceDataset; see the module docstring."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        prices = dataset.prices
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.log_prices = np.where(prices > 0, np.log(np.where(prices > 0, prices, 1.0)), np.nan)
+
+    def _log_row(self, period):
+        row = self.dataset.period_row(period)
+        if row is None:
+            return np.full(len(self.dataset.items), np.nan)
+        return self.log_prices[row]
+
+    def item_changes(self, start, end):
+        """Return the percentage change of every item from start to end, in dataset.items order."""
+        return np.expm1(self._log_row(end) - self._log_row(start)) * 100
+
+    def item_change(self, item, start, end):
+        """Return the percentage change of one item (label or series ID) from start to end; NaN if unknown."""
+        position = self.dataset.item_positions([item])[0]
+        if position < 0:
+            return np.nan
+        start_row, end_row = self.dataset.period_row(start), self.dataset.period_row(end)
+        if start_row is None or end_row is None:
+            return np.nan
+        return float(np.expm1(self.log_prices[end_row, position] - self.log_prices[start_row, position]) * 100)
+
+    def item_matrix(self, item, periods=None):
+        """Return (changes, periods) for one item, laid out like BasketIndex.matrix."""
+        periods = self.dataset.periods if periods is None else list(periods)
+        position = self.dataset.item_positions([item])[0]
+        if position < 0:
+            raise KeyError(item)
+        rows = [self.dataset.period_row(period) for period in periods]
+        logs = np.array([np.nan if row is None else self.log_prices[row, position] for row in rows])
+        return np.expm1(logs[None, :] - logs[:, None]) * 100, periods
+
+    def basket_index(self, items, quantities):
+        """Return a BasketIndex over the basket's monthly costs, priced once per basket through result_cache."""
+        def monthly_costs():
+            costs, complete = series_engine(self.dataset).cost_matrix(items, [quantities])
+            return np.where(complete[:, 0], costs[:, 0], np.nan)
+
+        if self.dataset.version is None:
+            return BasketIndex(self.dataset, monthly_costs())
+        key = ('basket_costs', self.dataset.version, self.dataset.basket_key(items, quantities))
+        return BasketIndex(self.dataset, result_cache.get_or_compute(key, monthly_costs))
+
+    def basket_change(self, items, quantities, start, end):
+        """Return the percentage change of a basket's total cost from start to end."""
+        return self.basket_index(items, quantities).change(start, end)
+
+    def basket_matrix(self, items, quantities, periods=None):
+        """Return (changes, periods): the basket's percentage change between every pair of periods."""
+        return self.basket_index(items, quantities).matrix(periods)
+
+
+def log_price_cube(dataset):
+    """Return the dataset's LogPriceCube."""
+    return dataset.derived('log_price_cube', LogPriceCube)
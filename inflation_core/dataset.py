@@ -0,0 +1,251 @@
+"""The price table prepared once for repeated lookups and matrix math."""
+import calendar
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .catalog import area_series_id, series_id_for_column
+
+DEFAULT_MONTH = 6
+GAP_METHODS = ('exclude', 'ffill', 'interpolate')
+DEFAULT_GAP_METHOD = 'exclude'
+
+
+def normalize_period(period):
+    """Turn a period into a (year, month) tuple.
+
+    Accepts (year, month) pairs, a bare year as a number or all-digit string
+    (meaning June, the month the app has always compared), or anything
+    pd.Timestamp understands.
+    """
+    if isinstance(period, tuple):
+        year, month = period
+        return int(year), int(month)
+    if isinstance(period, str) and period.strip().isdecimal():
+        period = int(period)
+    if isinstance(period, (int, np.integer)):
+        return int(period), DEFAULT_MONTH
+    timestamp = pd.Timestamp(period)
+    if timestamp is pd.NaT:
+        raise ValueError(f"{period!r} is not a period")
+    return timestamp.year, timestamp.month
+
+
+def format_period(period):
+    """Render a period as e.g. 'June 2024'."""
+    year, month = normalize_period(period)
+    return f"{calendar.month_name[month]} {year}"
+
+
+def fill_gaps(prices, rows, month_codes, method):
+    """Return prices with each column's gaps filled along time (prices itself when nothing is filled).
+
+    rows lists the dated rows in time order and month_codes their year * 12 +
+    month - 1 codes. 'ffill' carries the last observed price forward,
+    'interpolate' fills gaps between two observations linearly in time, and
+    'exclude' fills nothing. Months before an item's first observation stay
+    missing either way.
+    """
+    if method not in GAP_METHODS:
+        raise ValueError(f"Unknown gap method {method!r}; expected one of {', '.join(GAP_METHODS)}")
+    if method == 'exclude' or not len(rows):
+        return prices
+    filled = prices.copy()
+    ordered = pd.DataFrame(prices[rows], index=month_codes)
+    if method == 'ffill':
+        ordered = ordered.ffill()
+    else:
+        ordered = ordered.interpolate(method='index', limit_area='inside')
+    filled[rows] = ordered.to_numpy()
+    return filled
+
+
+class PriceDataset:
+    """A parsed price table with its item columns coerced into one float64 matrix.
+
+    frame is the table as loaded (Date column plus one column per item).
+    prices has one row per frame row and one column per entry of items;
+    unparseable cells such as the '-' placeholders become NaN. Items can be
+    looked up by column label or by BLS series ID; series_ids defaults to
+    resolving each column header through the goods catalog. period_index
+    maps each (year, month) to its row so period lookups never scan the table.
+    area_names maps BLS area codes to names for tables that span several areas.
+
+    Gaps are filled once, here, by gap_method (see fill_gaps): prices is the
+    filled matrix every calculation reads, observed marks the cells the
+    table itself priced, and filled_mask the cells that were filled in.
+    Filled datasets carry the method in their version so cached results of
+    different methods never mix. Months in which the table has no price at
+    all are never filled.
+    """
+
+    def __init__(self, frame, version=None, series_ids=None, area_names=None, gap_method=DEFAULT_GAP_METHOD):
+        self._set_table(frame, series_ids, area_names, gap_method)
+        self.version = self._method_version(version, gap_method)
+        self._fill(frame[self.items].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_prices(cls, frame, raw_prices, version=None, series_ids=None, area_names=None,
+                    gap_method=DEFAULT_GAP_METHOD):
+        """Build a dataset over frame's prices already coerced to float64 (a mapped snapshot's) without copying them."""
+        dataset = cls.__new__(cls)
+        dataset._set_table(frame, series_ids, area_names, gap_method)
+        dataset.version = cls._method_version(version, gap_method)
+        dataset._fill(raw_prices)
+        return dataset
+
+    @classmethod
+    def from_arrays(cls, frame, prices, observed, filled_mask, version=None, series_ids=None, area_names=None,
+                    gap_method=DEFAULT_GAP_METHOD):
+        """Wrap matrices prepared elsewhere (see shared.py) without copying, coercing or refilling them.
+
+        prices, observed and filled_mask must be what the constructor would
+        compute from frame with gap_method; they may be read-only. version is
+        used as given.
+        """
+        dataset = cls.__new__(cls)
+        dataset._set_table(frame, series_ids, area_names, gap_method)
+        dataset.version = version
+        dataset.prices = prices
+        dataset.observed = observed
+        dataset.filled_mask = filled_mask
+        dataset._index_periods()
+        return dataset
+
+    @staticmethod
+    def _method_version(version, gap_method):
+        return version if version is None or gap_method == DEFAULT_GAP_METHOD else f"{version}+{gap_method}"
+
+    def _fill(self, raw_prices):
+        self.observed = ~np.isnan(raw_prices)
+        self._index_periods()
+        fill_rows = np.array([self.period_index[period] for period in self.periods], dtype=np.intp)
+        self.prices = fill_gaps(raw_prices, fill_rows, [year * 12 + month - 1 for year, month in self.periods],
+                                self.gap_method)
+        self.filled_mask = ~np.isnan(self.prices) & ~self.observed
+
+    def _set_table(self, frame, series_ids, area_names, gap_method):
+        self.frame = frame
+        self.gap_method = gap_method
+        self.area_names = dict(area_names or {})
+        self.items = [column for column in frame.columns if column != 'Date']
+        self.dates = frame['Date']
+        self.series_ids = list(series_ids) if series_ids is not None else [series_id_for_column(item) for item in self.items]
+        self._item_positions = {series_id: position for position, series_id in enumerate(self.series_ids) if series_id}
+        self._item_positions.update((item, position) for position, item in enumerate(self.items))
+        self._derived = {}
+        self._derived_lock = threading.RLock()  # builders may use other derived structures
+
+    def _index_periods(self):
+        self.period_index = self._build_period_index(self.dates)
+        priced_rows = self.observed.any(axis=1)
+        self.periods = [period for period, row in self.period_index.items() if priced_rows[row]]
+        self.latest_period = self.periods[-1] if self.periods else None
+
+    def derived(self, name, build):
+        """Return a structure computed from this dataset, calling build(self) only the first time.
+
+        Engines, indexes and bitmaps hang off the dataset this way, so they
+        are rebuilt exactly when the table is reloaded and shared otherwise.
+        """
+        with self._derived_lock:
+            value = self._derived.get(name)
+            if value is None:
+                value = self._derived[name] = build(self)
+            return value
+
+    @staticmethod
+    def _build_period_index(dates):
+        index = {}
+        valid = dates.notna().to_numpy()
+        years = dates.dt.year.to_numpy()
+        months = dates.dt.month.to_numpy()
+        for row in np.flatnonzero(valid):
+            period = (int(years[row]), int(months[row]))
+            if period in index:
+                raise ValueError(f"Price table has more than one row for {format_period(period)}")
+            index[period] = int(row)
+        return dict(sorted(index.items()))
+
+    def item_positions(self, items):
+        """Return the matrix column of each item label or series ID, or -1 for items the table does not have."""
+        return np.array([self._item_positions.get(item, -1) for item in items], dtype=np.intp)
+
+    def items_in_area(self, items, area_code):
+        """Map items to the series ID of the same BLS item in another area (None where that cannot be known).
+
+        The mapped IDs can be passed anywhere items are accepted; series the
+        table does not carry are then skipped like any other unknown item.
+        """
+        mapped = []
+        for item in items:
+            position = self._item_positions.get(item)
+            series_id = self.series_ids[position] if position is not None else item
+            mapped.append(area_series_id(series_id, area_code))
+        return mapped
+
+    def basket_key(self, items, quantities):
+        """Return a canonical, hashable fingerprint of a basket.
+
+        Lines are keyed by series ID where one is known, merged, sorted and
+        stripped of zero quantities; items the table does not carry are left
+        out, since they never affect a result. Two baskets with equal keys
+        price identically against this dataset.
+        """
+        basket = {}
+        for item, quantity in zip(items, quantities):
+            position = self._item_positions.get(item)
+            if position is None:
+                continue
+            key = self.series_ids[position] or self.items[position]
+            basket[key] = basket.get(key, 0.0) + float(quantity)
+        return tuple(sorted((key, quantity) for key, quantity in basket.items() if quantity != 0))
+
+    def period_row(self, period):
+        """Return the row position for a period, or None if the table has no such month."""
+        return self.period_index.get(normalize_period(period))
+
+    def period_frame(self, period):
+        """Return the frame rows for a period (empty if the month is missing)."""
+        row = self.period_row(period)
+        return self.frame.iloc[[] if row is None else [row]]
+
+    def period_prices(self, period):
+        """Return the per-item prices for a period (gap-filled); NaN where an item has no price."""
+        row = self.period_row(period)
+        if row is None:
+            return np.full(len(self.items), np.nan)
+        return self.prices[row]
+
+    def coverage(self, items=None):
+        """Report, per item, the months priced by the table, filled in, and still missing.
+
+        Counts run over the months in periods; first and last are the first
+        and last months with a (possibly filled) price.
+        """
+        items = self.items if items is None else list(items)
+        positions = self.item_positions(items)
+        rows = np.array([self.period_index[period] for period in self.periods], dtype=np.intp)
+        known = positions >= 0
+        observed = np.zeros((len(rows), len(items)), dtype=bool)
+        filled = np.zeros((len(rows), len(items)), dtype=bool)
+        observed[:, known] = self.observed[np.ix_(rows, positions[known])]
+        filled[:, known] = self.filled_mask[np.ix_(rows, positions[known])]
+        priced = observed | filled
+        any_priced = priced.any(axis=0)
+        first = np.where(any_priced, priced.argmax(axis=0), -1)
+        last = np.where(any_priced, len(rows) - 1 - priced[::-1].argmax(axis=0), -1)
+        return pd.DataFrame({
+            'item': items,
+            'observed_months': observed.sum(axis=0),
+            'filled_months': filled.sum(axis=0),
+            'missing_months': len(rows) - priced.sum(axis=0),
+            'first_period': [format_period(self.periods[row]) if row >= 0 else None for row in first],
+            'last_period': [format_period(self.periods[row]) if row >= 0 else None for row in last],
+        })
+
+    def available_items(self, period):
+        """Return the items that have a price in the given period."""
+        prices = self.period_prices(period)
+        return [item for item, price in zip(self.items, prices) if not np.isnan(price)]
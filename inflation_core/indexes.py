@@ -0,0 +1,161 @@
+"""Chained Laspeyres, Paasche and Fisher price indexes with per-item contributions."""
+import numpy as np
+import pandas as pd
+
+from .dataset import format_period, normalize_period
+
+FORMULAS = ('laspeyres', 'paasche', 'fisher')
+
+
+def _quantity_axes(quantities, items, months):
+    """Return (fixed baskets-by-items quantities, None) or (None, baskets-by-months-by-items quantities)."""
+    quantities = np.asarray(quantities, dtype=np.float64)
+    if quantities.ndim == 1:
+        quantities = quantities[None, :]
+    if quantities.shape[-1] != len(items):
+        raise ValueError(f"quantities has {quantities.shape[-1]} item columns but {len(items)} items were given")
+    if quantities.ndim == 2:
+        return quantities, None
+    if quantities.ndim == 3 and quantities.shape[1] == months:
+        return None, quantities
+    raise ValueError(f"quantities must be items, baskets x items or baskets x {months} months x items")
+
+
+def chained_index_batch(dataset, items, quantities, formulas=FORMULAS, reference=None, contributions=False):
+    """Compute chained indexes, and optionally contributions, for one or more baskets over every priced month."""
+    unknown = set(formulas) - set(FORMULAS)
+    if unknown:
+        raise ValueError(f"Unknown index formulas: {', '.join(sorted(unknown))}; expected {', '.join(FORMULAS)}")
+    periods = list(dataset.periods)
+    fixed, varying = _quantity_axes(quantities, items, len(periods))
+    positions = dataset.item_positions(items)
+    included = positions >= 0
+    rows = np.array([dataset.period_index[period] for period in periods], dtype=np.intp)
+    prices = dataset.prices[np.ix_(rows, positions[included])]
+    priced = ~np.isnan(prices) & (prices > 0)
+    matched = priced[:-1] & priced[1:]
+    previous = np.where(matched, prices[:-1], 0.0)
+    current = np.where(matched, prices[1:], 0.0)
+
+    if fixed is not None:
+        weights = fixed[:, included]
+        held = (weights != 0).astype(np.float64)
+        first_priced = (priced.astype(np.float64) @ held.T).T > 0
+        # Quantities are the same in both months, so every formula shares one pair of products
+        base_value = (previous @ weights.T).T
+        laspeyres = paasche = _ratio((current @ weights.T).T, base_value)
+        q0 = q1 = weights[:, None, :]
+    else:
+        weights = np.compress(included, varying, axis=2)
+        first_priced = _values((weights != 0).astype(np.float64), priced.astype(np.float64)) > 0
+        # matmul falls off its fast path on strided arrays, so the item selection and month slices are C-contiguous copies
+        q0, q1 = np.ascontiguousarray(weights[:, :-1]), np.ascontiguousarray(weights[:, 1:])
+        base_value = _values(q0, previous)
+        laspeyres = _ratio(_values(q0, current), base_value)
+        paasche = _ratio(_values(q1, current), _values(q1, previous))
+    with np.errstate(invalid='ignore'):
+        links = {'laspeyres': laspeyres, 'paasche': paasche, 'fisher': np.sqrt(laspeyres * paasche)}
+
+    started = np.maximum.accumulate(first_priced, axis=1)
+    reference_column = None if reference is None else _period_column(periods, reference)
+    result = {'periods': periods, 'items': list(items), 'included': included}
+    for formula in formulas:
+        link = links[formula]
+        levels = np.concatenate([np.ones((len(link), 1)), np.cumprod(np.where(np.isnan(link), 1.0, link), axis=1)],
+                                axis=1)
+        # Rebase each basket on its first priced month
+        start = started.argmax(axis=1)
+        levels = np.where(started, levels / levels[np.arange(len(levels)), start][:, None] * 100, np.nan)
+        if reference_column is not None:
+            levels = levels / levels[:, [reference_column]] * 100
+        result[formula] = {
+            'links': np.concatenate([np.full((len(link), 1), np.nan), link], axis=1),
+            'index': levels,
+        }
+        if contributions:
+            monthly = _contributions(formula, q0, q1, previous, current, base_value, link)
+            monthly = np.concatenate([np.zeros((len(monthly), 1, monthly.shape[2])), monthly], axis=1)
+            result[formula]['contributions'] = _expand(monthly, included, len(items))
+            result[formula]['cumulative_contributions'] = _expand(
+                _cumulative(monthly, levels, reference_column), included, len(items))
+    return result
+
+
+def _period_column(periods, period):
+    period = normalize_period(period)
+    try:
+        return periods.index(period)
+    except ValueError:
+        raise ValueError(f"The price table has no prices for {format_period(period)}") from None
+
+
+def _values(quantities, prices):
+    """Return baskets x months sums of quantities (baskets x months or 1 x items) times prices (months x items)."""
+    if quantities.shape[1] == 1:
+        return (prices @ quantities[:, 0].T).T
+    # One matrix product per month rather than einsum, which does not use BLAS here
+    return np.matmul(quantities.transpose(1, 0, 2), prices[:, :, None])[..., 0].T
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _contributions(formula, q0, q1, previous, current, base_value, link):
+    """Return baskets x links x matched items percentage-point contributions to each link's change."""
+    change = current - previous
+    if formula == 'laspeyres':
+        return 100 * q0 * change / np.where(base_value > 0, base_value, np.nan)[..., None]
+    if formula == 'paasche':
+        total = _values(q1, previous)
+        return 100 * q1 * change / np.where(total > 0, total, np.nan)[..., None]
+    # Fisher: weights (q0 + q1 / Q_F) p0 with Q_F = V1 / (V0 F), V the value over matched items
+    value_1 = _values(q1, current)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        quantity_index = value_1 / (base_value * link)
+        blended = q0 + q1 / quantity_index[..., None]
+        total = _values(blended, previous)
+        return 100 * blended * change / np.where(total > 0, total, np.nan)[..., None]
+
+
+def _cumulative(monthly, levels, reference_column):
+    """Scale each month's terms by the previous index level / 100 and sum, so they add up to the index minus 100."""
+    previous_level = np.concatenate([np.full((len(levels), 1), np.nan), levels[:, :-1]], axis=1)
+    running = np.cumsum(np.nan_to_num(monthly) * np.nan_to_num(previous_level)[..., None] / 100, axis=1)
+    if reference_column is None:
+        return running
+    return running - running[:, [reference_column]]
+
+
+def _expand(values, included, item_count):
+    if included.all():
+        return values
+    expanded = np.zeros(values.shape[:2] + (item_count,))
+    expanded[..., included] = values
+    return expanded
+
+
+def chained_index(dataset, items, quantities, reference=None):
+    """Return one basket's chained indexes as a frame with 'Date' and one column per formula."""
+    result = chained_index_batch(dataset, items, quantities, reference=reference)
+    frame = pd.DataFrame({'Date': [pd.Timestamp(year=year, month=month, day=1) for year, month in result['periods']]})
+    for formula in FORMULAS:
+        frame[formula.capitalize()] = result[formula]['index'][0]
+    return frame
+
+
+def index_contributions(dataset, items, quantities, base_period, comparison_period, formula='fisher'):
+    """Return each item's 'contribution' (points) and 'share' (%) of one basket's chained change, largest first."""
+    result = chained_index_batch(dataset, items, quantities, formulas=[formula], reference=base_period,
+                                 contributions=True)
+    column = _period_column(result['periods'], comparison_period)
+    contribution = result[formula]['cumulative_contributions'][0, column]
+    change = result[formula]['index'][0, column] - 100
+    frame = pd.DataFrame({
+        'item': result['items'],
+        'contribution': contribution,
+        'share': contribution / change * 100 if change else np.nan,
+    })
+    frame = frame[result['included']]
+    return frame.iloc[np.argsort(-np.abs(frame['contribution'].to_numpy()), kind='stable')].reset_index(drop=True)
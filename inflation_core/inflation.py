@@ -0,0 +1,113 @@
+"""Basket inflation math, vectorized over many baskets and period pairs."""
+import numpy as np
+
+from .loader import load_dataset
+from .results import InflationResult, InflationSummary, ItemBlock
+
+
+def calculate_percentage_change(old_value, new_value):
+    """Calculate the percentage change from old_value to new_value."""
+    if old_value == 0:
+        return float('inf')
+    return ((new_value - old_value) / old_value) * 100
+
+
+def percentage_change_array(old_values, new_values):
+    """Element-wise calculate_percentage_change for arrays of old and new values."""
+    old_values = np.asarray(old_values, dtype=np.float64)
+    new_values = np.asarray(new_values, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (new_values - old_values) / old_values * 100
+    return np.where(old_values == 0, np.inf, change)
+
+
+def _basket_totals(quantities, prices):
+    """Return quantities @ prices.T, NaN only where a basket holds an item that has no price.
+
+    A plain matrix product would also poison every basket with a zero
+    quantity for an unpriced item, which in a wide batch matrix is most of them.
+    """
+    missing = np.isnan(prices)
+    totals = quantities @ np.where(missing, 0.0, prices).T
+    unpriced = (quantities != 0).astype(np.float64) @ missing.T.astype(np.float64)
+    totals[unpriced > 0] = np.nan
+    return totals
+
+
+def calculate_inflation_batch(dataset, items, quantities, period_pairs):
+    """Price every basket in quantities at every (base, comparison) period pair in one pass.
+
+    items names the quantity columns; quantities is a baskets-by-items array
+    (a single basket may be passed as a 1-D sequence). Periods are (year,
+    month) tuples or anything else normalize_period accepts. Items the dataset does not carry are
+    left out of every total, exactly as calculate_inflation skips them. A
+    basket's total is NaN when it holds a nonzero quantity of an item with no
+    price in that period; zero quantities mean the item is not in the basket.
+
+    Returns a dict of arrays. Per-item prices are (pairs, items); totals,
+    differences and percentage changes are (baskets, pairs). 'included' marks
+    the item columns that contributed.
+    """
+    quantities = np.atleast_2d(np.asarray(quantities, dtype=np.float64))
+    if quantities.shape[1] != len(items):
+        raise ValueError(f"quantities has {quantities.shape[1]} columns but {len(items)} items were given")
+
+    positions = dataset.item_positions(items)
+    included = positions >= 0
+    base_prices = np.full((len(period_pairs), len(items)), np.nan)
+    comparison_prices = np.full((len(period_pairs), len(items)), np.nan)
+    for pair, (base_period, comparison_period) in enumerate(period_pairs):
+        base_prices[pair, included] = dataset.period_prices(base_period)[positions[included]]
+        comparison_prices[pair, included] = dataset.period_prices(comparison_period)[positions[included]]
+
+    counted = quantities[:, included]
+    total_base_cost = _basket_totals(counted, base_prices[:, included])
+    total_comparison_cost = _basket_totals(counted, comparison_prices[:, included])
+    return {
+        'items': list(items),
+        'included': included,
+        'quantities': quantities,
+        'base_prices': base_prices,
+        'comparison_prices': comparison_prices,
+        'total_base_cost': total_base_cost,
+        'total_comparison_cost': total_comparison_cost,
+        'cost_difference': total_comparison_cost - total_base_cost,
+        'percentage_change': percentage_change_array(total_base_cost, total_comparison_cost),
+    }
+
+
+def inflation_summary(batch, basket=0, pair=0):
+    """Return one basket and period pair of a batch result as an InflationResult."""
+    included = batch['included']
+    items = ItemBlock(
+        [item for item, keep in zip(batch['items'], included) if keep],
+        batch['quantities'][basket, included],
+        batch['base_prices'][pair, included],
+        batch['comparison_prices'][pair, included],
+    )
+    summary = InflationSummary(
+        batch['total_base_cost'][basket, pair],
+        batch['total_comparison_cost'][basket, pair],
+        batch['cost_difference'][basket, pair],
+        batch['percentage_change'][basket, pair],
+    )
+    return InflationResult(summary, items)
+
+
+def get_june_data(year, dataset=None):
+    """Return the dataset rows for June of a specific year."""
+    dataset = load_dataset() if dataset is None else dataset
+    return dataset.period_frame((year, 6))
+
+
+def calculate_inflation(selected_items, amounts, base_period, comparison_period, dataset=None, area=None):
+    """Calculate the inflation for the selected items and amounts between two periods.
+
+    Returns an InflationResult (see results.py). Uses the default price table unless a dataset is given. With a BLS area
+    code, each item is priced from the same item's series in that area.
+    """
+    dataset = load_dataset() if dataset is None else dataset
+    lookup = selected_items if area is None else dataset.items_in_area(selected_items, area)
+    batch = calculate_inflation_batch(dataset, lookup, [amounts], [(base_period, comparison_period)])
+    batch['items'] = list(selected_items)
+    return inflation_summary(batch)
@@ -0,0 +1,147 @@
+"""Process-wide cache of the parsed price tables (CSVs, snapshots, stores and shared directories)."""
+import os
+import threading
+
+from .dataset import DEFAULT_GAP_METHOD, PriceDataset
+from .shared import CURRENT_FILE, attach, is_shared_directory
+from .snapshot import StaleSnapshotError, open_snapshot, snapshot_path_for
+from .sources import file_digest, read_price_csv
+from .store import CATALOG_FILE, PriceStore
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test1.csv')
+
+_lock = threading.Lock()
+_entries = {}
+_stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'snapshot_loads': 0, 'shared_attaches': 0}
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _store_signature(directory):
+    # PriceStore.save replaces the catalog after every change to the data files, so it alone marks a new table
+    stat = os.stat(os.path.join(directory, CATALOG_FILE))
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _read_table(path, digest):
+    """Parse path into (frame, prices), preferring a fresh memory-mapped snapshot next to it over the CSV itself.
+
+    prices is the snapshot's mapped float64 matrix, or None for a parsed CSV.
+    """
+    snapshot_path = snapshot_path_for(path)
+    if os.path.exists(snapshot_path):
+        try:
+            snapshot = open_snapshot(snapshot_path, expected_digest=digest)
+        except StaleSnapshotError:
+            pass
+        else:
+            _stats['snapshot_loads'] += 1
+            return snapshot.to_frame(), snapshot.prices
+    return read_price_csv(path), None
+
+
+def _load_shared_entry(path):
+    signature = _file_signature(os.path.join(path, CURRENT_FILE))
+    entry = _entries.get(path)
+    if entry is not None and entry['signature'] == signature:
+        _stats['hits'] += 1
+        return entry
+    table = attach(path)
+    if entry is not None:
+        if table.version == entry['digest']:
+            entry['signature'] = signature
+            _stats['hits'] += 1
+            return entry
+        _stats['reloads'] += 1
+    _stats['misses'] += 1
+    _stats['shared_attaches'] += 1
+    entry = {'signature': signature, 'digest': table.version, 'data': table.frame, 'options': {}, 'datasets': {},
+             'shared': table}
+    _entries[path] = entry
+    return entry
+
+
+def _load_entry(path):
+    path = os.path.abspath(path)
+    if os.path.isdir(path) and is_shared_directory(path):
+        return _load_shared_entry(path)
+    is_store = os.path.isdir(path)
+    signature = _store_signature(path) if is_store else _file_signature(path)
+    entry = _entries.get(path)
+    if entry is not None and entry['signature'] == signature:
+        _stats['hits'] += 1
+        return entry
+    store = PriceStore.open(path) if is_store else None
+    digest = store.content_digest() if is_store else file_digest(path)
+    if entry is not None:
+        if digest == entry['digest']:
+            entry['signature'] = signature
+            _stats['hits'] += 1
+            return entry
+        _stats['reloads'] += 1
+    _stats['misses'] += 1
+    if is_store:
+        data, prices = store.to_frame(), None
+        options = {'series_ids': store.series_ids, 'area_names': store.area_names}
+    else:
+        (data, prices), options = _read_table(path, digest), {}
+    entry = {'signature': signature, 'digest': digest, 'data': data, 'prices': prices, 'options': options,
+             'datasets': {}}
+    _entries[path] = entry
+    return entry
+
+
+def load_price_table(path=DEFAULT_DATA_PATH):
+    """Return the parsed price table for path, reusing the cached copy when the file is unchanged.
+
+    The file's mtime and size are checked on every call. When they differ from
+    the cached entry the contents are hashed, and the CSV is only re-parsed if
+    the hash changed too, so a touch or a copy of identical data is still a hit.
+    A snapshot compiled from the same contents (see inflation_core.snapshot) is
+    mapped instead of parsing the CSV; stale snapshots are ignored.
+    The returned frame is shared between callers and must not be modified.
+    """
+    with _lock:
+        return _load_entry(path)['data']
+
+
+def load_dataset(path=DEFAULT_DATA_PATH, gap_method=DEFAULT_GAP_METHOD):
+    """Return the cached PriceDataset for path, rebuilt only when the table itself is reloaded.
+
+    Each gap method (see PriceDataset) gets its own dataset, filled once
+    (or, for a published directory, filled by the publisher).
+    """
+    with _lock:
+        entry = _load_entry(path)
+        dataset = entry['datasets'].get(gap_method)
+        if dataset is None and 'shared' in entry:
+            dataset = entry['datasets'][gap_method] = entry['shared'].dataset(gap_method)
+        elif dataset is None and entry.get('prices') is not None:
+            # A mapped snapshot is already numeric; build over its pages rather than a private copy
+            dataset = entry['datasets'][gap_method] = PriceDataset.from_prices(
+                entry['data'], entry['prices'], version=entry['digest'], gap_method=gap_method, **entry['options']
+            )
+        elif dataset is None:
+            dataset = entry['datasets'][gap_method] = PriceDataset(
+                entry['data'], version=entry['digest'], gap_method=gap_method, **entry['options']
+            )
+        return dataset
+
+
+def cache_stats():
+    """Return a copy of the loader's hit, miss and reload counters."""
+    with _lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_entries)
+    return stats
+
+
+def clear_cache():
+    """Drop every cached table and reset the counters."""
+    with _lock:
+        _entries.clear()
+        for key in _stats:
+            _stats[key] = 0
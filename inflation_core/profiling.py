@@ -0,0 +1,186 @@
+"""Timing spans around the stages of a Streamlit script rerun, configured from the environment:
+
+    INFLATION_PROFILE=1              turn profiling on
+    INFLATION_PROFILE_JSONL=path     append one JSON line per finished rerun
+    INFLATION_PROFILE_PROM=path      rewrite a Prometheus text file after each rerun
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'stage', 'start')
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _StageStats:
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * (bucket_count + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class Profiler:
+    """Collects stage timings and per-session rerun counts, and exports them."""
+
+    def __init__(self, enabled=False, jsonl_path=None, prometheus_path=None, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._reruns = {}
+        self._last = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environ(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        jsonl_path = environ.get('INFLATION_PROFILE_JSONL') or None
+        prometheus_path = environ.get('INFLATION_PROFILE_PROM') or None
+        enabled = environ.get('INFLATION_PROFILE', '') not in ('', '0') or bool(jsonl_path or prometheus_path)
+        return cls(enabled, jsonl_path, prometheus_path)
+
+    def span(self, stage):
+        """Return a context manager timing the block as one occurrence of stage."""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, stage)
+
+    def record(self, stage, seconds):
+        """Add one timing for stage, to the aggregates and to the current rerun if any."""
+        rerun = getattr(self._local, 'rerun', None)
+        if rerun is not None:
+            rerun['spans'].append((stage, seconds))
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats(len(self.buckets))
+            stats.buckets[bisect_left(self.buckets, seconds)] += 1
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+
+    def start_rerun(self, session_id):
+        """Begin a rerun for session_id on this thread, finishing any rerun it left open."""
+        if not self.enabled:
+            return
+        if getattr(self._local, 'rerun', None) is not None:
+            self.end_rerun()
+        with self._lock:
+            self._reruns[session_id] = self._reruns.get(session_id, 0) + 1
+            number = self._reruns[session_id]
+        self._local.rerun = {'session': session_id, 'rerun': number, 'start': time.perf_counter(),
+                             'time': time.time(), 'spans': []}
+
+    def end_rerun(self):
+        """Finish this thread's rerun, export it, and return its record (None when off or not started)."""
+        rerun = getattr(self._local, 'rerun', None)
+        if not self.enabled or rerun is None:
+            return None
+        self._local.rerun = None
+        total = time.perf_counter() - rerun['start']
+        self.record('rerun', total)
+        record = {
+            'time': rerun['time'],
+            'session': rerun['session'],
+            'rerun': rerun['rerun'],
+            'total_s': total,
+            'spans': [{'stage': stage, 'seconds': seconds} for stage, seconds in rerun['spans']],
+        }
+        with self._lock:
+            self._last[rerun['session']] = record
+        if self.jsonl_path:
+            with open(self.jsonl_path, 'a') as handle:
+                handle.write(json.dumps(record) + '\n')
+        if self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+        return record
+
+    def last_rerun(self, session_id):
+        """Return the record of the last finished rerun of a session, or None."""
+        with self._lock:
+            return self._last.get(session_id)
+
+    def stats(self):
+        """Return per-stage count/total/max and per-session rerun counts."""
+        with self._lock:
+            stages = {
+                stage: {'count': stats.count, 'total_s': stats.total, 'max_s': stats.max,
+                        'mean_s': stats.total / stats.count}
+                for stage, stats in self._stages.items()
+            }
+            return {'enabled': self.enabled, 'stages': stages, 'reruns': dict(self._reruns)}
+
+    def prometheus_text(self):
+        """Render the aggregates in the Prometheus text exposition format."""
+        lines = [
+            '# HELP inflation_stage_seconds Time spent in each stage of a script rerun.',
+            '# TYPE inflation_stage_seconds histogram',
+        ]
+        with self._lock:
+            for stage, stats in sorted(self._stages.items()):
+                label = _label_value(stage)
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats.buckets):
+                    cumulative += count
+                    lines.append(f'inflation_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'inflation_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {stats.count}')
+                lines.append(f'inflation_stage_seconds_sum{{stage="{label}"}} {stats.total!r}')
+                lines.append(f'inflation_stage_seconds_count{{stage="{label}"}} {stats.count}')
+            lines.append('# HELP inflation_reruns_total Script reruns per session.')
+            lines.append('# TYPE inflation_reruns_total counter')
+            for session_id, count in sorted(self._reruns.items()):
+                lines.append(f'inflation_reruns_total{{session="{_label_value(session_id)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Atomically replace path with the current Prometheus text."""
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as handle:
+            handle.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+            self._reruns.clear()
+            self._last.clear()
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+profiler = Profiler.from_environ()
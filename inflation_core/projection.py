@@ -0,0 +1,180 @@
+"""Monte Carlo projections of a basket's future cost from a factor model of its items' monthly log returns."""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import result_cache
+
+DEFAULT_HISTORY_MONTHS = 120
+DEFAULT_HORIZON_MONTHS = 60
+DEFAULT_PATHS = 10_000
+DEFAULT_FACTORS = 8
+DEFAULT_CHUNK_PATHS = 250
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+# Below this many simulated prices (months x paths x items) a process pool costs more than it saves
+PARALLEL_MIN_CELLS = 50_000_000
+
+
+class ProjectionModel:
+    """Fitted monthly log-return dynamics for the priced items of one basket."""
+
+    __slots__ = ('items', 'quantities', 'last_prices', 'drift', 'loadings', 'idiosyncratic_sd', 'start_period',
+                 'history_months')
+
+    def __init__(self, items, quantities, last_prices, drift, loadings, idiosyncratic_sd, start_period,
+                 history_months):
+        self.items = items
+        self.quantities = quantities
+        self.last_prices = last_prices
+        self.drift = drift
+        self.loadings = loadings
+        self.idiosyncratic_sd = idiosyncratic_sd
+        self.start_period = start_period
+        self.history_months = history_months
+
+    @property
+    def covariance(self):
+        """The shrunk covariance of monthly log returns the simulation draws from."""
+        return self.loadings @ self.loadings.T + np.diag(self.idiosyncratic_sd ** 2)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+def fit_projection(dataset, items, quantities, history_months=DEFAULT_HISTORY_MONTHS, factors=DEFAULT_FACTORS):
+    """Fit a ProjectionModel for a basket from the last history_months calendar months of the price table.
+
+    Items the table does not carry, or that have no price in the window, are
+    left out (their quantities with them), as calculate_inflation skips them.
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    positions = dataset.item_positions(items)
+    # One row per calendar month, NaN for months the table has no prices for, so every return spans one month
+    year, month = dataset.periods[-1]
+    last = year * 12 + month - 1
+    rows = np.array([dataset.period_index.get((code // 12, code % 12 + 1), -1)
+                     for code in range(last - history_months + 1, last + 1)], dtype=np.intp)
+    window = dataset.prices[np.ix_(np.maximum(rows, 0), np.where(positions >= 0, positions, 0))]
+    window[rows < 0] = np.nan
+    priced = (positions >= 0) & (quantities != 0) & ~np.isnan(window).all(axis=0)
+    window = window[:, priced]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(window), axis=0)
+    present = ~np.isnan(returns)
+    counts = present.sum(axis=0)
+    drift = np.where(counts > 0, np.nansum(returns, axis=0) / np.maximum(counts, 1), 0.0)
+    centred = np.where(present, returns - drift, 0.0)
+    pair_counts = present.T.astype(np.float64) @ present.astype(np.float64)
+    covariance = (centred.T @ centred) / np.maximum(pair_counts - 1, 1)
+
+    # Keep the leading eigenvectors as common factors and the rest of each item's variance as its own, which keeps
+    # the estimate well conditioned with more items than months and makes a month of shocks cost items x factors
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    keep = min(factors, len(eigenvalues))
+    eigenvalues = np.clip(eigenvalues[::-1][:keep], 0.0, None)
+    loadings = eigenvectors[:, ::-1][:, :keep] * np.sqrt(eigenvalues)
+    residual = np.clip(np.diag(covariance) - (loadings ** 2).sum(axis=1), 0.0, None)
+
+    last_prices = pd.DataFrame(window).ffill().to_numpy()[-1]
+    return ProjectionModel(
+        items=[item for item, keep_item in zip(items, priced) if keep_item],
+        quantities=quantities[priced],
+        last_prices=last_prices,
+        drift=drift,
+        loadings=loadings,
+        idiosyncratic_sd=np.sqrt(residual),
+        start_period=dataset.periods[-1],
+        history_months=len(rows),
+    )
+
+
+def _simulate_chunk(model, horizon_months, paths, seed_sequence):
+    """Return the basket's total cost for paths simulated paths, shape (horizon_months, paths).
+
+    Paths come in antithetic pairs (each draw of shocks is used once as is
+    and once negated), which halves the random numbers drawn and narrows the
+    bands' sampling error. Work is done in float32, in place.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    items, factors = model.loadings.shape
+    half = (paths + 1) // 2
+    log_growth = np.empty((2, horizon_months, half, items), dtype=np.float32)
+    shocks = log_growth[0]
+    rng.standard_normal((horizon_months, half, items), dtype=np.float32, out=shocks)
+    shocks *= model.idiosyncratic_sd.astype(np.float32)
+    shocks += rng.standard_normal((horizon_months, half, factors), dtype=np.float32) @ model.loadings.T.astype(np.float32)
+    np.negative(shocks, out=log_growth[1])
+    log_growth += model.drift.astype(np.float32)
+    for month in range(1, horizon_months):
+        log_growth[:, month] += log_growth[:, month - 1]
+    np.exp(log_growth, out=log_growth)
+    log_growth *= model.last_prices.astype(np.float32)
+    totals = log_growth @ model.quantities.astype(np.float32)
+    return totals.transpose(1, 0, 2).reshape(horizon_months, 2 * half)[:, :paths].astype(np.float64)
+
+
+def simulate_costs(model, horizon_months=DEFAULT_HORIZON_MONTHS, paths=DEFAULT_PATHS, seed=0, workers=None,
+                   chunk_paths=DEFAULT_CHUNK_PATHS):
+    """Simulate the basket's total cost; returns a (horizon_months, paths) array.
+
+    Chunks of chunk_paths paths run on up to workers processes (1 runs in
+    this process). By default small simulations run in this process and
+    larger ones on every core. Workers are spawned rather than forked, so
+    this is safe to call from a threaded server. The same seed gives the same
+    paths for any number of workers.
+    """
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None:
+        cells = horizon_months * paths * len(model.items)
+        workers = os.cpu_count() or 1 if cells >= PARALLEL_MIN_CELLS else 1
+    workers = min(workers, len(sizes))
+    if workers <= 1:
+        chunks = [_simulate_chunk(model, horizon_months, size, child) for size, child in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            chunks = list(pool.map(_simulate_chunk, [model] * len(sizes), [horizon_months] * len(sizes),
+                                   sizes, seeds))
+    return np.concatenate(chunks, axis=1) if chunks else np.zeros((horizon_months, 0))
+
+
+def projection_bands(model, costs, percentiles=DEFAULT_PERCENTILES):
+    """Summarize simulated costs as a frame of monthly percentile bands.
+
+    The first row is the last historical month, where every band equals the
+    basket's current cost, so the bands join the historical series.
+    """
+    year, month = model.start_period
+    dates = pd.date_range(pd.Timestamp(year=year, month=month, day=1), periods=len(costs) + 1, freq='MS')
+    start_cost = float(model.last_prices @ model.quantities)
+    bands = np.percentile(costs, percentiles, axis=1)
+    frame = pd.DataFrame({'Date': dates})
+    for percentile, band in zip(percentiles, bands):
+        frame[f'p{percentile:g}'] = np.concatenate([[start_cost], band])
+    return frame
+
+
+def project_basket_cost(dataset, items, quantities, horizon_months=DEFAULT_HORIZON_MONTHS, paths=DEFAULT_PATHS,
+                        percentiles=DEFAULT_PERCENTILES, seed=0, workers=None):
+    """Return percentile bands of the basket's projected monthly cost, cached per basket and settings.
+
+    The frame has a 'Date' column and one 'p<percentile>' column per entry
+    of percentiles.
+    """
+    def compute():
+        model = fit_projection(dataset, items, quantities)
+        return projection_bands(model, simulate_costs(model, horizon_months, paths, seed, workers), percentiles)
+
+    if dataset.version is None:
+        return compute()
+    key = ('projection', dataset.version, dataset.basket_key(items, quantities), horizon_months, paths,
+           tuple(percentiles), seed)
+    return result_cache.get_or_compute(key, compute)
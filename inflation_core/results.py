@@ -0,0 +1,111 @@
+"""Column-oriented result types for basket inflation."""
+import sys
+
+import numpy as np
+
+
+class InflationSummary:
+    """A basket's total cost at both periods and the change between them."""
+
+    __slots__ = ('total_base_cost', 'total_comparison_cost', 'cost_difference', 'percentage_change')
+
+    def __init__(self, total_base_cost, total_comparison_cost, cost_difference, percentage_change):
+        self.total_base_cost = float(total_base_cost)
+        self.total_comparison_cost = float(total_comparison_cost)
+        self.cost_difference = float(cost_difference)
+        self.percentage_change = float(percentage_change)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'InflationSummary({fields})'
+
+
+class ItemBlock:
+    """Per-item amounts and prices of a basket, one float64 array per column, in basket order.
+
+    Only items the price table carries are present. Costs are derived from
+    amounts and prices on access.
+    """
+
+    __slots__ = ('items', 'amounts', 'base_prices', 'comparison_prices')
+
+    def __init__(self, items, amounts, base_prices, comparison_prices):
+        self.items = list(items)
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.base_prices = np.asarray(base_prices, dtype=np.float64)
+        self.comparison_prices = np.asarray(comparison_prices, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def base_costs(self):
+        return self.base_prices * self.amounts
+
+    @property
+    def comparison_costs(self):
+        return self.comparison_prices * self.amounts
+
+    @property
+    def percentage_changes(self):
+        """Each item's price change in percent; NaN where either price is missing or the base price is zero."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = (self.comparison_prices - self.base_prices) / self.base_prices * 100
+        return np.where(self.base_prices == 0, np.nan, change)
+
+    @property
+    def nbytes(self):
+        return (self.amounts.nbytes + self.base_prices.nbytes + self.comparison_prices.nbytes
+                + sys.getsizeof(self.items) + sum(sys.getsizeof(item) for item in self.items))
+
+    def to_numpy(self):
+        """Return {column: array}; the stored columns are the block's own arrays, not copies."""
+        return {
+            'amount': self.amounts,
+            'base_price': self.base_prices,
+            'comparison_price': self.comparison_prices,
+            'base_cost': self.base_costs,
+            'comparison_cost': self.comparison_costs,
+        }
+
+    def to_arrow(self):
+        """Return the block as a pyarrow Table with an 'item' column; numeric columns share the arrays' buffers."""
+        import pyarrow as pa
+
+        columns = {'item': pa.array(self.items, type=pa.string())}
+        columns.update((name, pa.array(values)) for name, values in self.to_numpy().items())
+        return pa.table(columns)
+
+    def to_frame(self):
+        import pandas as pd
+
+        frame = pd.DataFrame(self.to_numpy(), copy=False)
+        frame.insert(0, 'item', self.items)
+        return frame
+
+
+class InflationResult:
+    """What calculate_inflation returns: summary totals plus the per-item ItemBlock."""
+
+    __slots__ = ('summary', 'items')
+
+    def __init__(self, summary, items):
+        self.summary = summary
+        self.items = items
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self.summary) + self.items.nbytes
+
+    def to_dict(self):
+        """Return the result in the JSON-friendly layout {'summary': {...}, 'items': [{...}, ...]}."""
+        columns = {name: values.tolist() for name, values in self.items.to_numpy().items()}
+        rows = [{'item': item, **dict(zip(columns, values))}
+                for item, *values in zip(self.items.items, *columns.values())]
+        return {'summary': self.summary.to_dict(), 'items': rows}
+
+    def __repr__(self):
+        return f'InflationResult({self.summary!r}, items={len(self.items)})'
@@ -0,0 +1,143 @@
+"""Typeahead search over a dataset's item catalog: a sorted-token prefix index plus trigram fuzzy matching."""
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+from .catalog import AREA_NAMES, NATIONAL_AREA_CODE, split_series_header, split_series_id
+
+DEFAULT_LIMIT = 50
+FIELD_WEIGHTS = {'name': 1.0, 'series': 1.0, 'area': 0.8, 'unit': 0.6}
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.5
+FUZZY_MIN_SIMILARITY = 0.5
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(token):
+    padded = f' {token} '
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+def _label_fields(label):
+    """Split a column label into (name, unit): "Milk, whole - gal." or "APU... - Eggs, grade A, per doz."."""
+    parsed = split_series_header(label)
+    text = parsed[1] if parsed is not None else label
+    name, separator, unit = text.rpartition(' - ')
+    if not separator:
+        name, _, unit = text.partition(' per ')
+    return name, unit
+
+
+def _csr(keys, postings):
+    """Lay out {key: {value: weight}} as (sorted keys, offsets, values, weights)."""
+    keys = sorted(keys)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[key]) for key in keys])
+    values = np.fromiter((value for key in keys for value in postings[key]), dtype=np.int32, count=offsets[-1])
+    weights = np.fromiter((weight for key in keys for weight in postings[key].values()), dtype=np.float32,
+                          count=offsets[-1])
+    return keys, offsets, values, weights
+
+
+class CatalogIndex:
+    """Inverted prefix and trigram index over one PriceDataset's item columns."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.labels = list(dataset.items)
+        postings = {}
+        national = np.ones(len(self.labels), dtype=bool)
+        for document, (label, series_id) in enumerate(zip(self.labels, dataset.series_ids)):
+            name, unit = _label_fields(label)
+            fields = {'name': tokenize(name), 'unit': tokenize(unit), 'series': [], 'area': []}
+            codes = split_series_id(series_id)
+            if series_id:
+                fields['series'].append(series_id.lower())
+            if codes is not None:
+                area_code, item_code = codes
+                national[document] = area_code == NATIONAL_AREA_CODE
+                fields['series'].append(item_code.lower())
+                area_name = dataset.area_names.get(area_code) or AREA_NAMES.get(area_code) or ''
+                fields['area'] = tokenize(area_name) + [area_code]
+            for field, tokens in fields.items():
+                for token in tokens:
+                    documents = postings.setdefault(token, {})
+                    documents[document] = max(documents.get(document, 0.0), FIELD_WEIGHTS[field])
+        self.tokens, self.offsets, self.documents, self.weights = _csr(postings, postings)
+        self.national = national
+        self.label_lengths = np.array([len(label) for label in self.labels], dtype=np.int32)
+
+        token_trigrams = {}
+        self.trigram_counts = np.zeros(len(self.tokens), dtype=np.int32)
+        for position, token in enumerate(self.tokens):
+            trigrams = _trigrams(token)
+            self.trigram_counts[position] = len(trigrams)
+            for trigram in trigrams:
+                token_trigrams.setdefault(trigram, {})[position] = 1.0
+        trigrams, offsets, token_ids, _ = _csr(token_trigrams, token_trigrams)
+        self._trigram_slices = {trigram: (offsets[i], offsets[i + 1]) for i, trigram in enumerate(trigrams)}
+        self._trigram_tokens = token_ids
+
+    def _token_range(self, word):
+        """Return the [lo, hi) range of tokens starting with word."""
+        return bisect_left(self.tokens, word), bisect_left(self.tokens, word + '\uffff')
+
+    def _fuzzy_tokens(self, word, exclude):
+        """Return (token positions, similarities) of tokens close to word, outside the exclude range."""
+        trigrams = _trigrams(word)
+        slices = [self._trigram_slices[trigram] for trigram in trigrams if trigram in self._trigram_slices]
+        if not slices:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        votes = np.concatenate([self._trigram_tokens[start:end] for start, end in slices])
+        candidates, shared = np.unique(votes, return_counts=True)
+        similarity = 2.0 * shared / (len(trigrams) + self.trigram_counts[candidates])
+        keep = (similarity >= FUZZY_MIN_SIMILARITY) & ((candidates < exclude[0]) | (candidates >= exclude[1]))
+        return candidates[keep], similarity[keep]
+
+    def _word_scores(self, word):
+        scores = np.zeros(len(self.labels), dtype=np.float32)
+        lo, hi = self._token_range(word)
+        if lo < hi:
+            start, end = self.offsets[lo], self.offsets[hi]
+            factor = np.full(end - start, PREFIX_SCORE, dtype=np.float32)
+            if self.tokens[lo] == word:
+                factor[:self.offsets[lo + 1] - start] = EXACT_SCORE
+            np.maximum.at(scores, self.documents[start:end], self.weights[start:end] * factor)
+        if len(word) >= 3 and word.isalpha():
+            for token, similarity in zip(*self._fuzzy_tokens(word, (lo, hi))):
+                start, end = self.offsets[token], self.offsets[token + 1]
+                np.maximum.at(scores, self.documents[start:end],
+                              self.weights[start:end] * np.float32(FUZZY_SCORE * similarity))
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT, allowed=None):
+        """Return up to limit item labels matching query, best first.
+
+        allowed, a boolean mask over dataset.items, restricts the results
+        (e.g. to the items priced in the periods being compared). An empty
+        query returns the first allowed items in table order.
+        """
+        words = tokenize(query)
+        if not words:
+            positions = np.arange(len(self.labels)) if allowed is None else np.flatnonzero(allowed)
+            return [self.labels[position] for position in positions[:limit]]
+        total = np.zeros(len(self.labels), dtype=np.float32)
+        matched = np.ones(len(self.labels), dtype=bool) if allowed is None else np.array(allowed, dtype=bool)
+        for word in words:
+            scores = self._word_scores(word)
+            matched &= scores > 0
+            total += scores
+        positions = np.flatnonzero(matched)
+        order = np.lexsort((positions, self.label_lengths[positions], ~self.national[positions], -total[positions]))
+        return [self.labels[position] for position in positions[order[:limit]]]
+
+
+def catalog_index(dataset):
+    """Return the dataset's CatalogIndex."""
+    return dataset.derived('catalog_index', CatalogIndex)
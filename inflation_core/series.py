@@ -0,0 +1,92 @@
+"""Basket cost over time, each basket priced in every month with one matrix-vector product."""
+import numpy as np
+import pandas as pd
+
+from .cache import result_cache
+
+
+class BasketSeriesEngine:
+    """Computes and caches basket cost series for one PriceDataset."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        missing = np.isnan(dataset.prices)
+        self.filled_prices = np.where(missing, 0.0, dataset.prices)
+        self.gap_matrix = missing.astype(np.float32)
+        self.filled_matrix = dataset.filled_mask.astype(np.float32) if dataset.filled_mask.any() else None
+        self.dated = dataset.dates.notna().to_numpy()
+
+    @classmethod
+    def from_arrays(cls, dataset, filled_prices, gap_matrix, filled_matrix):
+        """Wrap matrices the constructor would compute for dataset (e.g. shared read-only mappings)."""
+        engine = cls.__new__(cls)
+        engine.dataset = dataset
+        engine.filled_prices = filled_prices
+        engine.gap_matrix = gap_matrix
+        engine.filled_matrix = filled_matrix
+        engine.dated = dataset.dates.notna().to_numpy()
+        return engine
+
+    def weights(self, items, quantities):
+        """Scatter baskets-by-items quantities onto the dataset's columns; unknown items are dropped."""
+        quantities = np.atleast_2d(np.asarray(quantities, dtype=np.float64))
+        positions = self.dataset.item_positions(items)
+        included = positions >= 0
+        weights = np.zeros((quantities.shape[0], len(self.dataset.items)))
+        np.add.at(weights, (slice(None), positions[included]), quantities[:, included])
+        return weights
+
+    def cost_matrix(self, items, quantities):
+        """Return (costs, complete), both months-by-baskets.
+
+        complete is False for months in which a basket holds an item without a
+        price (or the row has no date); costs is only meaningful where it is True.
+        """
+        weights = self.weights(items, quantities)
+        costs = self.filled_prices @ weights.T
+        gaps = self.gap_matrix @ (weights != 0).T.astype(np.float32)
+        complete = (gaps == 0) & self.dated[:, None]
+        return costs, complete
+
+    def filled_months(self, items, quantities):
+        """Return a months-by-baskets mask of the months in which a basket uses a filled-in price."""
+        weights = self.weights(items, quantities)
+        if self.filled_matrix is None:
+            return np.zeros((len(self.filled_prices), len(weights)), dtype=bool)
+        return (self.filled_matrix @ (weights != 0).T.astype(np.float32)) > 0
+
+    def series(self, items, amounts):
+        """Return the 'Date'/'TotalCost'/'Filled' frame for one basket, shared through result_cache."""
+        if self.dataset.version is None:
+            return self._compute_series(items, amounts)
+        key = ('series', self.dataset.version, self.dataset.basket_key(items, amounts))
+        return result_cache.get_or_compute(key, lambda: self._compute_series(items, amounts))
+
+    def _compute_series(self, items, amounts):
+        costs, complete = self.cost_matrix(items, [amounts])
+        complete = complete[:, 0]
+        return pd.DataFrame({
+            'Date': self.dataset.dates.to_numpy()[complete],
+            'TotalCost': costs[complete, 0],
+            'Filled': self.filled_months(items, [amounts])[complete, 0],
+        })
+
+
+def series_engine(dataset):
+    """Return the dataset's BasketSeriesEngine."""
+    return dataset.derived('series_engine', BasketSeriesEngine)
+
+
+def basket_cost_matrix(dataset, items, quantities):
+    """Price several baskets in every month at once; see BasketSeriesEngine.cost_matrix."""
+    return series_engine(dataset).cost_matrix(items, quantities)
+
+
+def basket_cost_series(dataset, selected_items, amounts):
+    """Return the basket's total cost for every month in which all of its items have a price.
+
+    The result has 'Date' and 'TotalCost' columns, like the data behind the
+    total-cost chart, and 'Filled', true for months that use a filled-in
+    price. It is shared with later calls for the same basket.
+    """
+    return series_engine(dataset).series(selected_items, amounts)
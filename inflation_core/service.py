@@ -0,0 +1,271 @@
+"""Local HTTP JSON service for basket inflation queries, batching concurrent requests.
+
+    POST /inflation
+    {"items": ["Eggs - doz.", "APU0000709112"], "quantities": [2, 1],
+     "base": "2019-06", "comparison": "2024-06"}
+
+GET /health, /stats and /metrics (Prometheus text) are also served.
+
+    python -m inflation_core.service --port 8502
+"""
+import argparse
+import asyncio
+import json
+import math
+from http import HTTPStatus
+
+import numpy as np
+
+from .dataset import DEFAULT_GAP_METHOD, GAP_METHODS, format_period, normalize_period
+from .inflation import calculate_inflation_batch
+from .loader import DEFAULT_DATA_PATH, load_dataset
+from .profiling import profiler
+from .results import InflationResult, InflationSummary, ItemBlock
+from .series import basket_cost_matrix
+
+MAX_BODY_BYTES = 1 << 20
+
+
+class BadRequest(ValueError):
+    """A query the service cannot answer; reported to the client as HTTP 400."""
+
+
+def _parse_period(value, field):
+    if value is None:
+        raise BadRequest(f"{field!r} is required")
+    try:
+        return normalize_period(tuple(value) if isinstance(value, list) else value)
+    except (TypeError, ValueError) as error:
+        raise BadRequest(f"invalid {field} period {value!r}") from error
+
+
+def canonical_query(payload):
+    """Validate a request body and return its canonical, hashable key.
+
+    Items are merged and sorted so that the same basket written in a
+    different order or with repeated lines coalesces with the original.
+    """
+    items = payload.get('items')
+    quantities = payload.get('quantities')
+    if not isinstance(items, list) or not isinstance(quantities, list) or len(items) != len(quantities):
+        raise BadRequest("'items' and 'quantities' must be lists of the same length")
+    basket = {}
+    for item, quantity in zip(items, quantities):
+        if not isinstance(item, str) or isinstance(quantity, bool) or not isinstance(quantity, (int, float)):
+            raise BadRequest("items must be strings and quantities numbers")
+        try:
+            basket[item] = basket.get(item, 0) + float(quantity)
+        except OverflowError:
+            basket[item] = math.inf
+    # json.loads accepts NaN, Infinity and 1e400; none of them prices a basket
+    if not all(math.isfinite(quantity) for quantity in basket.values()):
+        raise BadRequest("quantities must be finite numbers")
+    basket_key = tuple(sorted((item, quantity) for item, quantity in basket.items() if quantity != 0))
+    return basket_key, _parse_period(payload.get('base'), 'base'), _parse_period(payload.get('comparison'), 'comparison')
+
+
+def _json_number(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _finite(record):
+    """Replace a record's NaN and infinite floats with None, which JSON can carry."""
+    return {key: _json_number(value) if isinstance(value, float) else value for key, value in record.items()}
+
+
+def price_queries(dataset, period_pair, baskets):
+    """Price several canonical baskets at one period pair; returns one response dict per basket."""
+    with profiler.span('price_queries'):
+        return _price_queries(dataset, period_pair, baskets)
+
+
+def _price_queries(dataset, period_pair, baskets):
+    items = sorted({item for basket in baskets for item, _ in basket})
+    columns = {item: position for position, item in enumerate(items)}
+    quantities = np.zeros((len(baskets), len(items)))
+    for row, basket in enumerate(baskets):
+        for item, quantity in basket:
+            quantities[row, columns[item]] = quantity
+
+    batch = calculate_inflation_batch(dataset, items, quantities, [period_pair])
+    costs, complete = basket_cost_matrix(dataset, items, quantities)
+    dates = np.datetime_as_string(dataset.dates.to_numpy(), unit='D')
+    base, comparison = period_pair
+    responses = []
+    for row, basket in enumerate(baskets):
+        known = [(item, quantity) for item, quantity in basket if batch['included'][columns[item]]]
+        positions = [columns[item] for item, _ in known]
+        result = InflationResult(
+            InflationSummary(batch['total_base_cost'][row, 0], batch['total_comparison_cost'][row, 0],
+                             batch['cost_difference'][row, 0], batch['percentage_change'][row, 0]),
+            ItemBlock([item for item, _ in known], [quantity for _, quantity in known],
+                      batch['base_prices'][0, positions], batch['comparison_prices'][0, positions]),
+        )
+        body = result.to_dict()
+        months = np.flatnonzero(complete[:, row])
+        responses.append({
+            'base_period': format_period(base),
+            'comparison_period': format_period(comparison),
+            'summary': _finite(body['summary']),
+            'items': [_finite(item_row) for item_row in body['items']],
+            'unmatched_items': [item for item, _ in basket if not batch['included'][columns[item]]],
+            'series': [{'date': str(dates[month]), 'total_cost': _json_number(costs[month, row])} for month in months],
+        })
+    return responses
+
+
+class InflationService:
+    """Coalesces identical queries and micro-batches the rest into the vectorized path."""
+
+    def __init__(self, dataset, max_batch=128, max_delay=0.002):
+        self.dataset = dataset
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {'queries': 0, 'coalesced': 0, 'batches': 0, 'batched_queries': 0}
+        self._inflight = {}
+        self._pending = []
+        self._flush_handle = None
+
+    async def query(self, payload):
+        """Answer one request body, sharing work with identical and concurrent queries."""
+        key = canonical_query(payload)
+        self.stats['queries'] += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        self._pending.append(key)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        groups = {}
+        for key in pending:
+            groups.setdefault(key[1:], []).append(key)
+        for period_pair, keys in groups.items():
+            asyncio.ensure_future(self._run_group(period_pair, keys))
+
+    async def _run_group(self, period_pair, keys):
+        self.stats['batches'] += 1
+        self.stats['batched_queries'] += len(keys)
+        loop = asyncio.get_running_loop()
+        try:
+            responses = await loop.run_in_executor(
+                None, price_queries, self.dataset, period_pair, [key[0] for key in keys]
+            )
+        except Exception as error:
+            for key in keys:
+                self._inflight.pop(key).set_exception(error)
+        else:
+            for key, response in zip(keys, responses):
+                self._inflight.pop(key).set_result(response)
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, honouring keep-alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = headers.get('connection', '').lower() != 'close' and version.strip() == 'HTTP/1.1'
+                status, payload = await self._dispatch(method, path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return HTTPStatus.OK, {'status': 'ok', 'dataset_version': self.dataset.version}
+        if method == 'GET' and path == '/stats':
+            return HTTPStatus.OK, self.stats
+        if method == 'GET' and path == '/metrics':
+            return HTTPStatus.OK, profiler.prometheus_text()
+        if path != '/inflation':
+            return HTTPStatus.NOT_FOUND, {'error': f'no route for {path}'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'use POST'}
+        try:
+            payload = json.loads(body or b'{}')
+            if not isinstance(payload, dict):
+                raise BadRequest('request body must be a JSON object')
+            return HTTPStatus.OK, await self.query(payload)
+        except (BadRequest, json.JSONDecodeError) as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        except Exception as error:
+            # Answer rather than let handle_connection drop the socket without a response
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f'{type(error).__name__}: {error}'}
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8502, data_path=DEFAULT_DATA_PATH, gap_method=DEFAULT_GAP_METHOD, **options):
+    """Start the service and run until cancelled."""
+    service = InflationService(load_dataset(data_path, gap_method), **options)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    print(f"listening on http://{bound_host}:{bound_port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve basket inflation queries over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502, help='port to bind; 0 picks a free one')
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='price table CSV, PriceStore or published directory (default: %(default)s)')
+    parser.add_argument('--gaps', choices=GAP_METHODS, default=DEFAULT_GAP_METHOD,
+                        help='how missing prices are filled before pricing (default: %(default)s)')
+    parser.add_argument('--max-batch', type=int, default=128, help='queries priced together at most')
+    parser.add_argument('--max-delay-ms', type=float, default=2.0, help='how long a query waits for batch-mates')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.data, args.gaps, max_batch=args.max_batch,
+                          max_delay=args.max_delay_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
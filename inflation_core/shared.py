@@ -0,0 +1,224 @@
+"""A price table published once to a directory and mapped read-only by every worker process.
+
+Directory layout; the pointer is replaced atomically after each new generation is written:
+
+    CURRENT       JSON {"file", "version", "generation"} naming the live generation file
+    gen-*.bin     8 bytes magic b'INFLSHD1', uint64 header length (little-endian),
+                  JSON header (version, catalog, {name: [offset, dtype, shape]}),
+                  then the arrays, each starting on a 64-byte boundary
+
+    python -m inflation_core.shared /dev/shm/inflation --data June2024_Full_City.csv --watch 60
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DEFAULT_GAP_METHOD, GAP_METHODS, PriceDataset
+
+MAGIC = b'INFLSHD1'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+CURRENT_FILE = 'CURRENT'
+DEFAULT_KEEP = 2
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def is_shared_directory(path):
+    return os.path.isfile(os.path.join(path, CURRENT_FILE))
+
+
+def read_pointer(directory):
+    """Return the CURRENT pointer of a published directory: {'file': ..., 'version': ..., 'generation': ...}."""
+    with open(os.path.join(directory, CURRENT_FILE)) as handle:
+        return json.load(handle)
+
+
+class SharedPriceTable:
+    """One generation of a published table, mapped read-only."""
+
+    def __init__(self, path, header, buffer):
+        self.path = path
+        self.header = header
+        self.version = header['version']
+        self._buffer = buffer
+        self.frame = pd.DataFrame(self.array('raw_prices'), columns=header['items'], copy=False)
+        self.frame.insert(0, 'Date', pd.DatetimeIndex(self.array('dates')))
+
+    def array(self, name):
+        """Return a read-only view of one stored array."""
+        offset, dtype, shape = self.header['arrays'][name]
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        return np.frombuffer(self._buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+    @property
+    def gap_methods(self):
+        return self.header['gap_methods']
+
+    def dataset(self, gap_method=DEFAULT_GAP_METHOD):
+        """Return a PriceDataset over the mapped arrays for one of the published gap methods."""
+        if gap_method not in self.gap_methods:
+            raise ValueError(f"{self.path} has no {gap_method!r} prices; published: {', '.join(self.gap_methods)}")
+        observed = self.array('observed')
+        if gap_method == DEFAULT_GAP_METHOD:
+            prices, filled_mask = self.array('raw_prices'), np.broadcast_to(np.False_, observed.shape)
+        else:
+            prices, filled_mask = self.array(f'prices.{gap_method}'), self.array(f'filled.{gap_method}')
+        version = self.version if gap_method == DEFAULT_GAP_METHOD else f"{self.version}+{gap_method}"
+        dataset = PriceDataset.from_arrays(self.frame, prices, observed, filled_mask, version=version,
+                                           series_ids=self.header['series_ids'],
+                                           area_names=self.header['area_names'], gap_method=gap_method)
+        from .series import BasketSeriesEngine
+
+        filled_matrix = f'engine.{gap_method}.filled_matrix'
+        dataset.derived('series_engine', lambda dataset: BasketSeriesEngine.from_arrays(
+            dataset, self.array(f'engine.{gap_method}.filled_prices'), self.array(f'engine.{gap_method}.gap_matrix'),
+            self.array(filled_matrix) if filled_matrix in self.header['arrays'] else None))
+        return dataset
+
+
+def open_generation(path):
+    """Map one generation file read-only."""
+    with open(path, 'rb') as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a published price table")
+        (header_length,) = struct.unpack('<Q', handle.read(8))
+        header = json.loads(handle.read(header_length).decode('utf-8'))
+        if header['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"{path} uses format {header['format_version']}, expected {FORMAT_VERSION}")
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return SharedPriceTable(path, header, buffer)
+
+
+def attach(directory):
+    """Map the generation the directory's CURRENT pointer names."""
+    return open_generation(os.path.join(directory, read_pointer(directory)['file']))
+
+
+def _write_generation(path, datasets):
+    from .series import series_engine
+
+    base = datasets[DEFAULT_GAP_METHOD]
+    arrays = {
+        'dates': base.dates.to_numpy(),
+        'raw_prices': base.prices,
+        'observed': base.observed,
+    }
+    for method, dataset in datasets.items():
+        if method != DEFAULT_GAP_METHOD:
+            arrays[f'prices.{method}'] = dataset.prices
+            arrays[f'filled.{method}'] = dataset.filled_mask
+        engine = series_engine(dataset)
+        arrays[f'engine.{method}.filled_prices'] = engine.filled_prices
+        arrays[f'engine.{method}.gap_matrix'] = engine.gap_matrix
+        if engine.filled_matrix is not None:
+            arrays[f'engine.{method}.filled_matrix'] = engine.filled_matrix
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'version': base.version,
+        'created': time.time(),
+        'gap_methods': list(datasets),
+        'items': base.items,
+        'series_ids': base.series_ids,
+        'area_names': base.area_names,
+        'arrays': {},
+    }
+    # Offsets depend on the header's length, which depends on the offsets; reserve room for them first
+    placeholder = {name: [0, array.dtype.str, list(array.shape)] for name, array in arrays.items()}
+    header_length = len(json.dumps({**header, 'arrays': placeholder}).encode('utf-8')) + 32 * len(arrays)
+    offset = _align(len(MAGIC) + 8 + header_length)
+    for name, array in arrays.items():
+        header['arrays'][name] = [offset, array.dtype.str, list(array.shape)]
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8').ljust(header_length)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack('<Q', header_length))
+        handle.write(header_bytes)
+        for name, array in arrays.items():
+            handle.seek(header['arrays'][name][0])
+            handle.write(array.tobytes())
+        handle.truncate(offset)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+
+
+def publish(directory, data_path, gap_methods=GAP_METHODS, keep=DEFAULT_KEEP, force=False):
+    """Publish the table at data_path into directory and swap the CURRENT pointer to it.
+
+    Returns the pointer. Nothing is written when the current generation
+    already holds the same table version, unless force is set. Generations
+    beyond the newest keep are deleted; workers that still map one keep
+    reading it until they follow the pointer.
+    """
+    from .loader import load_dataset
+
+    if keep < 1:
+        raise ValueError(f"keep must be at least 1 (the generation CURRENT names), got {keep}")
+    os.makedirs(directory, exist_ok=True)
+    gap_methods = [DEFAULT_GAP_METHOD] + [method for method in gap_methods if method != DEFAULT_GAP_METHOD]
+    datasets = {method: load_dataset(data_path, method) for method in gap_methods}
+    version = datasets[DEFAULT_GAP_METHOD].version
+    current = read_pointer(directory) if is_shared_directory(directory) else None
+    if current is not None and current['version'] == version and not force:
+        return current
+
+    generation = current['generation'] + 1 if current is not None else 1
+    name = f"gen-{generation:06d}-{version[:12]}.bin"
+    _write_generation(os.path.join(directory, name), datasets)
+    pointer = {'file': name, 'version': version, 'generation': generation}
+    temp_path = os.path.join(directory, CURRENT_FILE + '.tmp')
+    with open(temp_path, 'w') as handle:
+        json.dump(pointer, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, os.path.join(directory, CURRENT_FILE))
+
+    generations = sorted(name for name in os.listdir(directory) if name.startswith('gen-') and name.endswith('.bin'))
+    for stale in generations[:-keep]:
+        os.remove(os.path.join(directory, stale))
+    return pointer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Publish a price table for worker processes to map read-only.')
+    parser.add_argument('directory', help='directory to publish into (under /dev/shm to keep it in memory)')
+    parser.add_argument('--data', required=True, help='price CSV, snapshot-backed CSV or PriceStore directory')
+    parser.add_argument('--gaps', nargs='+', choices=GAP_METHODS, default=list(GAP_METHODS),
+                        help='gap methods to publish (default: all)')
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP, help='generations to keep on disk')
+    parser.add_argument('--force', action='store_true', help='publish even if the table is unchanged')
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help='keep running, republishing whenever the table changes')
+    args = parser.parse_args(argv)
+    if args.keep < 1:
+        parser.error('--keep must be at least 1')
+
+    published = None
+    while True:
+        pointer = publish(args.directory, args.data, args.gaps, args.keep, args.force)
+        if pointer != published:
+            print(f"{args.directory}: generation {pointer['generation']} ({pointer['file']})", flush=True)
+            published = pointer
+        if args.watch is None:
+            return
+        args.force = False
+        time.sleep(args.watch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Compact binary snapshots of the price CSVs, opened through a read-only memory map.
+
+File layout (all integers little-endian):
+
+    8 bytes   magic, b'INFLSNP1'
+    8 bytes   uint64 length of the JSON header
+    n bytes   JSON header: shape, column catalog and source checksum
+    padding   to a 64-byte boundary
+    rows * 8  date vector, datetime64[D]
+    padding   to a 64-byte boundary
+    rows * cols * 8   float64 price matrix, row-major (one row per month)
+
+    python -m inflation_core.snapshot test1.csv
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from .catalog import series_id_for_column, split_series_header
+from .sources import file_digest, read_price_csv
+
+MAGIC = b'INFLSNP1'
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+SNAPSHOT_SUFFIX = '.snapshot'
+DATE_DTYPE = np.dtype('<M8[D]')
+PRICE_DTYPE = np.dtype('<f8')
+
+
+class StaleSnapshotError(ValueError):
+    """Raised when a snapshot was compiled from different CSV contents, or by an older format, than expected."""
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def snapshot_path_for(csv_path):
+    """Return the default snapshot path that sits next to a price CSV."""
+    return os.path.splitext(csv_path)[0] + SNAPSHOT_SUFFIX
+
+
+class PriceSnapshot:
+    """A memory-mapped price table: date vector, float64 matrix and series catalog."""
+
+    def __init__(self, path, header, dates, prices, buffer):
+        self.path = path
+        self.header = header
+        self.dates = dates
+        self.prices = prices
+        self._buffer = buffer
+
+    @property
+    def series_ids(self):
+        return self.header['series_ids']
+
+    @property
+    def labels(self):
+        return self.header['labels']
+
+    @property
+    def descriptions(self):
+        return self.header['descriptions']
+
+    @property
+    def source_sha256(self):
+        return self.header['source_sha256']
+
+    def column_index(self):
+        """Map each BLS series ID to its column position in the price matrix."""
+        return {series_id: position for position, series_id in enumerate(self.series_ids)}
+
+    def to_frame(self):
+        """Wrap the mapped arrays in a frame shaped like read_price_csv's output, without copying prices."""
+        frame = pd.DataFrame(self.prices, columns=self.labels, copy=False)
+        frame.insert(0, 'Date', pd.DatetimeIndex(self.dates.astype('datetime64[ns]')))
+        return frame
+
+    def close(self):
+        self.dates = self.prices = None
+        self._buffer.close()
+
+
+def compile_snapshot(csv_path, output_path=None):
+    """Compile a price CSV into a snapshot file and return the snapshot's path.
+
+    Every price column must resolve to a BLS series ID, either from a
+    "APU... - description" header or through the goods catalog.
+    """
+    output_path = output_path or snapshot_path_for(csv_path)
+    data = read_price_csv(csv_path)
+    data = data[data['Date'].notna()]
+
+    labels = [column for column in data.columns if column != 'Date']
+    series_ids, descriptions, unknown = [], [], []
+    for label in labels:
+        series_id = series_id_for_column(label)
+        if series_id is None:
+            unknown.append(label)
+        parsed = split_series_header(label)
+        series_ids.append(series_id)
+        descriptions.append(parsed[1] if parsed else label)
+    if unknown:
+        raise ValueError(f"No BLS series ID known for columns: {', '.join(unknown)}")
+
+    dates = data['Date'].to_numpy().astype(DATE_DTYPE)
+    prices = np.ascontiguousarray(
+        data[labels].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=PRICE_DTYPE)
+    )
+    header = {
+        'format_version': FORMAT_VERSION,
+        'source_name': os.path.basename(csv_path),
+        'source_sha256': file_digest(csv_path),
+        'rows': int(prices.shape[0]),
+        'cols': int(prices.shape[1]),
+        'series_ids': series_ids,
+        'labels': labels,
+        'descriptions': descriptions,
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+    prices_start = data_start + _align(dates.nbytes)
+
+    temp_path = output_path + '.tmp'
+    with open(temp_path, 'wb') as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack('<Q', len(header_bytes)))
+        handle.write(header_bytes)
+        handle.seek(data_start)
+        handle.write(dates.tobytes())
+        handle.seek(prices_start)
+        handle.write(prices.tobytes())
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def open_snapshot(path, source_path=None, expected_digest=None):
+    """Memory-map a snapshot read-only.
+
+    When source_path or expected_digest is given, the snapshot's recorded
+    checksum must match it or StaleSnapshotError is raised.
+    """
+    if expected_digest is None and source_path is not None:
+        expected_digest = file_digest(source_path)
+
+    with open(path, 'rb') as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a price snapshot")
+        (header_length,) = struct.unpack('<Q', handle.read(8))
+        header = json.loads(handle.read(header_length).decode('utf-8'))
+        if header['format_version'] != FORMAT_VERSION:
+            raise StaleSnapshotError(f"{path} uses snapshot format {header['format_version']}, expected {FORMAT_VERSION}")
+        if expected_digest is not None and header['source_sha256'] != expected_digest:
+            raise StaleSnapshotError(f"{path} was compiled from a different version of {header['source_name']}")
+        buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    rows, cols = header['rows'], header['cols']
+    data_start = _align(len(MAGIC) + 8 + header_length)
+    prices_start = data_start + _align(rows * DATE_DTYPE.itemsize)
+    dates = np.frombuffer(buffer, dtype=DATE_DTYPE, count=rows, offset=data_start)
+    prices = np.frombuffer(buffer, dtype=PRICE_DTYPE, count=rows * cols, offset=prices_start).reshape(rows, cols)
+    return PriceSnapshot(path, header, dates, prices, buffer)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile price CSVs into memory-mappable snapshots.')
+    parser.add_argument('csv', nargs='+', help='price CSV files to compile')
+    parser.add_argument('-o', '--output', help='output path (only valid with a single input)')
+    args = parser.parse_args(argv)
+    if args.output and len(args.csv) > 1:
+        parser.error('--output can only be used with a single input file')
+    for csv_path in args.csv:
+        output_path = compile_snapshot(csv_path, args.output)
+        print(f"{csv_path} -> {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Reading and fingerprinting the price CSVs on disk."""
+import hashlib
+
+import pandas as pd
+
+DATE_FORMAT = '%m/%d/%y'
+LONG_DATE_FORMAT = '%m/%d/%Y'
+
+
+def detect_date_format(values):
+    """Pick the short or four-digit-year date format used by a column of date strings."""
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            return LONG_DATE_FORMAT if len(value.strip().rsplit('/', 1)[-1]) == 4 else DATE_FORMAT
+    return DATE_FORMAT
+
+
+def read_price_csv(path, date_format=None):
+    """Parse a wide price CSV into a frame with a datetime 'Date' column."""
+    data = pd.read_csv(path)
+    if date_format is None:
+        date_format = detect_date_format(data['Date'])
+    data['Date'] = pd.to_datetime(data['Date'], format=date_format, errors='coerce')
+    return data
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,284 @@
+"""A multi-vintage price store: months-by-series matrix keyed by BLS series ID, saved as a directory.
+
+    catalog.json  series IDs, labels, descriptions, area names, row count and data file names
+    months.bin    int32 month codes (year * 12 + month - 1), one per row
+    prices.bin    float64 prices, row-major, one row per month code
+
+A save that only adds rows appends them; any other change writes new
+months.N.bin/prices.N.bin files. The catalog is replaced last either way.
+
+    python -m inflation_core.store build prices_store June2024_Full_City.csv test1.csv
+    python -m inflation_core.store append prices_store new_months.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .catalog import series_id_for_column, series_id_to_goods, split_series_header
+from .dataset import PriceDataset
+from .sources import read_price_csv
+
+CATALOG_FILE = 'catalog.json'
+MONTHS_FILE = 'months.bin'
+PRICES_FILE = 'prices.bin'
+MONTH_DTYPE = np.dtype('<i4')
+PRICE_DTYPE = np.dtype('<f8')
+
+
+def month_code(year, month):
+    return year * 12 + month - 1
+
+
+def _data_files(generation):
+    if generation == 0:
+        return MONTHS_FILE, PRICES_FILE
+    return f'months.{generation}.bin', f'prices.{generation}.bin'
+
+
+def _write_at(path, offset, data, create):
+    """Write data at offset, dropping anything after it, and flush it to disk."""
+    with open(path, 'wb' if create else 'r+b') as handle:
+        handle.seek(offset)
+        handle.write(data)
+        handle.truncate()
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _grown(capacity, needed):
+    while capacity < needed:
+        capacity = max(2 * capacity, 16)
+    return capacity
+
+
+class PriceStore:
+    """Monthly prices for any number of series, merged from any number of vintages."""
+
+    def __init__(self):
+        self.series_ids = []
+        self.labels = {}
+        self.descriptions = {}
+        self.area_names = {}
+        self.rows = 0
+        self._column_of = {}
+        self._row_of = {}
+        self._months = np.empty(0, dtype=MONTH_DTYPE)
+        self._prices = np.empty((0, 0), dtype=PRICE_DTYPE)
+        self._saved_to = None
+        self._saved_rows = 0
+        self._saved_columns = 0
+        self._generation = 0
+        self._rewrite = True
+
+    @property
+    def months(self):
+        return self._months[:self.rows]
+
+    @property
+    def prices(self):
+        return self._prices[:self.rows, :len(self.series_ids)]
+
+    def _reserve(self, rows, columns):
+        row_capacity, column_capacity = self._prices.shape
+        if rows <= row_capacity and columns <= column_capacity:
+            return
+        row_capacity = _grown(row_capacity, rows)
+        column_capacity = _grown(column_capacity, columns)
+        # Cells outside the used rows and columns are set to NaN when they are claimed
+        prices = np.empty((row_capacity, column_capacity), dtype=PRICE_DTYPE)
+        prices[:self.rows, :len(self.series_ids)] = self.prices
+        months = np.empty(row_capacity, dtype=MONTH_DTYPE)
+        months[:self.rows] = self.months
+        self._prices, self._months = prices, months
+
+    def _columns_for(self, series_ids, descriptions=None):
+        new = [series_id for series_id in dict.fromkeys(series_ids) if series_id not in self._column_of]
+        self._reserve(self.rows, len(self.series_ids) + len(new))
+        self._prices[:self.rows, len(self.series_ids):len(self.series_ids) + len(new)] = np.nan
+        for series_id in new:
+            self._column_of[series_id] = len(self.series_ids)
+            self.series_ids.append(series_id)
+        for series_id, description in zip(series_ids, descriptions or []):
+            if description:
+                self.descriptions[series_id] = description
+        return np.array([self._column_of[series_id] for series_id in series_ids], dtype=np.intp)
+
+    def _rows_for(self, codes):
+        new = [code for code in dict.fromkeys(codes) if code not in self._row_of]
+        self._reserve(self.rows + len(new), len(self.series_ids))
+        self._prices[self.rows:self.rows + len(new)] = np.nan
+        for code in new:
+            self._row_of[code] = self.rows
+            self._months[self.rows] = code
+            self.rows += 1
+        return np.array([self._row_of[code] for code in codes], dtype=np.intp)
+
+    def upsert(self, codes, series_ids, values, descriptions=None):
+        """Write a block of prices; NaN cells leave existing values untouched.
+
+        codes are month codes (see month_code), values is len(codes) by
+        len(series_ids).
+        """
+        values = np.asarray(values, dtype=PRICE_DTYPE)
+        columns = self._columns_for(list(series_ids), descriptions)
+        saved_rows = self._saved_rows
+        rows = self._rows_for(list(codes))
+        present = ~np.isnan(values)
+        if np.any(present[rows < saved_rows][:, columns < self._saved_columns]):
+            self._rewrite = True
+        block = self._prices[np.ix_(rows, columns)]
+        block[present] = values[present]
+        self._prices[np.ix_(rows, columns)] = block
+
+    def insert_records(self, codes, series_ids, values, descriptions=None):
+        """Write long-format (month code, series ID, price) records, keeping prices already stored.
+
+        Returns the number of records written; records for a (series, month)
+        that already has a price, or with a NaN price, are skipped.
+        """
+        values = np.asarray(values, dtype=PRICE_DTYPE)
+        columns = self._columns_for(list(series_ids), descriptions)
+        rows = self._rows_for(list(codes))
+        fresh = np.isnan(self._prices[rows, columns]) & ~np.isnan(values)
+        self._prices[rows[fresh], columns[fresh]] = values[fresh]
+        if np.any(fresh & (rows < self._saved_rows) & (columns < self._saved_columns)):
+            self._rewrite = True
+        return int(fresh.sum())
+
+    def ingest_frame(self, frame):
+        """Merge a frame shaped like read_price_csv's output (either header style)."""
+        frame = frame[frame['Date'].notna()]
+        labels = [column for column in frame.columns if column != 'Date']
+        series_ids = [series_id_for_column(label) for label in labels]
+        unknown = [label for label, series_id in zip(labels, series_ids) if series_id is None]
+        if unknown:
+            raise ValueError(f"No BLS series ID known for columns: {', '.join(unknown)}")
+        descriptions = [(split_series_header(label) or (None, None))[1] for label in labels]
+        codes = (frame['Date'].dt.year * 12 + frame['Date'].dt.month - 1).tolist()
+        values = frame[labels].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=PRICE_DTYPE)
+        self.upsert(codes, series_ids, values, descriptions)
+
+    def ingest_csv(self, path):
+        """Merge one price CSV vintage into the store."""
+        self.ingest_frame(read_price_csv(path))
+
+    def label(self, series_id):
+        """Return the display label for a series.
+
+        Series ingested from the raw BLS files (see bls.py) use their generated
+        catalog label. Series known only from the legacy CSVs fall back to the
+        curated goods name, then to the description parsed from their header.
+        """
+        return (self.labels.get(series_id) or series_id_to_goods.get(series_id) or self.descriptions.get(series_id)
+                or series_id)
+
+    def to_frame(self):
+        """Return the store as a wide frame sorted by month, labelled like the app's table."""
+        order = np.argsort(self.months, kind='stable')
+        codes = self.months[order]
+        frame = pd.DataFrame(self.prices[order], columns=[self.label(series_id) for series_id in self.series_ids])
+        frame.insert(0, 'Date', pd.to_datetime({'year': codes // 12, 'month': codes % 12 + 1, 'day': 1}))
+        return frame
+
+    def content_digest(self):
+        """Return a SHA-256 over the store's series, months and prices."""
+        digest = hashlib.sha256(json.dumps(self.series_ids).encode('utf-8'))
+        order = np.argsort(self.months, kind='stable')
+        digest.update(self.months[order].tobytes())
+        digest.update(np.ascontiguousarray(self.prices[order]).tobytes())
+        return digest.hexdigest()
+
+    def to_dataset(self):
+        """Build a PriceDataset over the merged table, versioned by its content digest."""
+        return PriceDataset(self.to_frame(), version=self.content_digest(), series_ids=self.series_ids,
+                            area_names=self.area_names)
+
+    def goods_catalog(self):
+        """Return {label: series_id} for every stored series, the generated counterpart of goods_to_series_id."""
+        return {self.label(series_id): series_id for series_id in self.series_ids}
+
+    def save(self, directory):
+        """Persist the store, appending only the new rows when that is all that changed."""
+        os.makedirs(directory, exist_ok=True)
+        columns = len(self.series_ids)
+        appendable = (
+            not self._rewrite
+            and self._saved_to == os.path.abspath(directory)
+            and self._saved_columns == columns
+        )
+        generation = self._generation if appendable else self._generation + 1
+        start = self._saved_rows if appendable else 0
+        months_file, prices_file = _data_files(generation)
+        _write_at(os.path.join(directory, months_file), start * MONTH_DTYPE.itemsize,
+                  self._months[start:self.rows].tobytes(), create=not appendable)
+        _write_at(os.path.join(directory, prices_file), start * columns * PRICE_DTYPE.itemsize,
+                  np.ascontiguousarray(self._prices[start:self.rows, :columns]).tobytes(), create=not appendable)
+        catalog = {'rows': self.rows, 'series_ids': self.series_ids, 'labels': self.labels,
+                   'descriptions': self.descriptions, 'area_names': self.area_names, 'generation': generation}
+        temp_path = os.path.join(directory, CATALOG_FILE + '.tmp')
+        with open(temp_path, 'w') as handle:
+            json.dump(catalog, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, os.path.join(directory, CATALOG_FILE))
+        if generation != self._generation:
+            for name in _data_files(self._generation):
+                if name not in (months_file, prices_file) and os.path.exists(os.path.join(directory, name)):
+                    os.remove(os.path.join(directory, name))
+        self._saved_to = os.path.abspath(directory)
+        self._saved_rows = self.rows
+        self._saved_columns = columns
+        self._generation = generation
+        self._rewrite = False
+
+    @classmethod
+    def open(cls, directory):
+        """Load a store saved with save(), with room for new rows."""
+        with open(os.path.join(directory, CATALOG_FILE)) as handle:
+            catalog = json.load(handle)
+        rows, columns = catalog['rows'], len(catalog['series_ids'])
+        store = cls()
+        store.series_ids = list(catalog['series_ids'])
+        store.labels = dict(catalog.get('labels', {}))
+        store.descriptions = dict(catalog['descriptions'])
+        store.area_names = dict(catalog.get('area_names', {}))
+        store._generation = catalog.get('generation', 0)
+        store._column_of = {series_id: column for column, series_id in enumerate(store.series_ids)}
+        row_capacity = _grown(rows, rows + 1)
+        store._months = np.empty(row_capacity, dtype=MONTH_DTYPE)
+        store._prices = np.empty((row_capacity, columns), dtype=PRICE_DTYPE)
+        for name, array in zip(_data_files(store._generation), (store._months, store._prices)):
+            target = memoryview(array[:rows]).cast('B')
+            with open(os.path.join(directory, name), 'rb') as handle:
+                if handle.readinto(target) != len(target):
+                    raise ValueError(f"{os.path.join(directory, name)} is shorter than its catalog says")
+        store.rows = rows
+        store._row_of = {int(code): row for row, code in enumerate(store.months)}
+        store._saved_to = os.path.abspath(directory)
+        store._saved_rows = rows
+        store._saved_columns = columns
+        store._rewrite = False
+        return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or extend a multi-vintage price store.')
+    parser.add_argument('command', choices=['build', 'append'],
+                        help='build a new store from scratch, or append to an existing one')
+    parser.add_argument('store', help='store directory')
+    parser.add_argument('csv', nargs='+', help='price CSVs to ingest, oldest vintage first')
+    args = parser.parse_args(argv)
+
+    store = PriceStore.open(args.store) if args.command == 'append' else PriceStore()
+    for path in args.csv:
+        store.ingest_csv(path)
+    store.save(args.store)
+    print(f"{args.store}: {store.rows} months x {len(store.series_ids)} series")
+
+
+if __name__ == '__main__':
+    main()
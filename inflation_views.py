@@ -0,0 +1,412 @@
+"""HTML, CSS and chart builders for the Streamlit app, importable without Streamlit.
+
+inflation_calculator.py passes what these return to st.markdown and
+st.altair_chart; keeping them here lets benchmarks time them directly.
+The page's style sheet never changes while the server runs, so it is built,
+minified and cached once per process by page_styles(), and every element
+styles itself through its classes instead of repeating inline styles.
+"""
+import functools
+import html
+import math
+import re
+
+import altair as alt
+
+# Rows of the per-item breakdown table shown without scrolling
+ITEM_TABLE_VISIBLE_ROWS = 15
+
+
+def build_total_cost_chart(total_cost_df, projection_df=None):
+    """Build the Altair line chart for a 'Date'/'TotalCost' frame.
+
+    projection_df, from project_basket_cost, overlays the projected 5-95 and
+    25-75 percentile bands and the median after the last historical month.
+    """
+    # Define the chart text properties
+    text_color = '#222944'
+    font_size = 16
+    font_weight = 'bold'
+    title_font_size = 20
+    title_font_weight = 'bold'
+    chart_title = 'Total Cost of Selected Basket Over Time'
+
+    # Plot the total basket cost over time using Altair
+    chart = alt.Chart(total_cost_df).mark_line(point=True).encode(
+        x=alt.X('Date:T', axis=alt.Axis(format='%Y', title='', tickCount='year', grid=True, tickSize=10, labelFontSize=font_size, labelFontWeight=font_weight)),
+        y=alt.Y('TotalCost:Q', title='Total Cost', scale=alt.Scale(zero=False), axis=alt.Axis(
+            format='$,.0f',
+            titleFontSize=title_font_size,
+            titleFontWeight=title_font_weight,
+            labelFontSize=font_size,
+            labelFontWeight=font_weight
+        )),
+        tooltip=[alt.Tooltip('TotalCost:Q', title='Total Cost', format='$,.2f')]
+    )
+    if projection_df is not None:
+        projection = alt.Chart(projection_df)
+        chart = alt.layer(
+            projection.mark_area(color=text_color, opacity=0.12).encode(x='Date:T', y=alt.Y('p5:Q', title='Total Cost'), y2='p95:Q'),
+            projection.mark_area(color=text_color, opacity=0.25).encode(x='Date:T', y=alt.Y('p25:Q', title='Total Cost'), y2='p75:Q'),
+            chart,
+            projection.mark_line(color=text_color, strokeDash=[6, 4]).encode(
+                x='Date:T', y=alt.Y('p50:Q', title='Total Cost'),
+                tooltip=[alt.Tooltip('Date:T', format='%B %Y'), alt.Tooltip('p5:Q', title='5th percentile', format='$,.2f'),
+                         alt.Tooltip('p50:Q', title='Median', format='$,.2f'), alt.Tooltip('p95:Q', title='95th percentile', format='$,.2f')]
+            ),
+        )
+    return _style_chart(chart, chart_title)
+
+
+def build_index_chart(index_df):
+    """Build the Altair line chart for a chained_index frame ('Date' plus one column per index formula)."""
+    long_df = index_df.melt('Date', var_name='Formula', value_name='Index').dropna()
+    chart = alt.Chart(long_df).mark_line().encode(
+        x=alt.X('Date:T', axis=alt.Axis(format='%Y', title='', tickCount='year', grid=True)),
+        y=alt.Y('Index:Q', title='Index', scale=alt.Scale(zero=False)),
+        color=alt.Color('Formula:N', scale=alt.Scale(range=['#222944', '#A33B20', '#5B8E7D']), legend=alt.Legend(orient='bottom')),
+        strokeDash=alt.StrokeDash('Formula:N', legend=None),
+        tooltip=[alt.Tooltip('Date:T', format='%B %Y'), 'Formula:N', alt.Tooltip('Index:Q', format=',.1f')]
+    )
+    return _style_chart(chart, 'Chained Price Index of Selected Basket')
+
+
+def _style_chart(chart, chart_title):
+    """Apply the app's chart size, colors and fonts."""
+    chart_background_color = '#F3F5F8'
+    text_color = '#222944'
+    font_family = 'Gotham'
+    font_size = 16
+    font_weight = 'bold'
+    title_font_size = 20
+    title_font_weight = 'bold'
+    chart = chart.properties(
+        title=chart_title,
+        width=700,
+        height=400,
+        background=chart_background_color
+    ).configure_view(
+        fill=chart_background_color,
+        stroke=text_color,  # Set the border color
+        strokeWidth=2  # Set the border width
+    ).configure_axis(
+        labelFont=font_family,
+        titleFont=font_family,
+        labelColor=text_color,
+        titleColor=text_color,
+        labelFontSize=font_size,
+        titleFontSize=title_font_size,
+        labelFontWeight=font_weight,
+        titleFontWeight=title_font_weight
+    ).configure_title(
+        font=font_family,
+        fontSize=title_font_size,
+        fontWeight=title_font_weight,
+        anchor='middle',  # Center the title
+        color=text_color
+    ).configure_legend(
+        labelFont=font_family,
+        titleFont=font_family,
+        labelColor=text_color,
+        titleColor=text_color,
+        labelFontSize=font_size,
+        titleFontSize=title_font_size,
+        labelFontWeight=font_weight,
+        titleFontWeight=title_font_weight
+    )
+    return chart
+
+
+def summary_html(result, base_label, comparison_label):
+    """Build the bordered summary table for a calculate_inflation result."""
+    summary = result.summary
+    return f"""
+    <div style="border: 2px solid #222944; border-radius: 10px; padding: 10px; width: 100%; font-family: 'Gotham'; color: #222944;">
+        <table style="width:100%; border-collapse: collapse;">
+            <tr style="border-bottom: 1px solid #222944;">
+                <td style="padding: 8px;"><strong>Total {base_label} Cost:</strong></td>
+                <td style="padding: 8px;">${summary.total_base_cost:.2f}</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #222944;">
+                <td style="padding: 8px;"><strong>Total {comparison_label} Cost:</strong></td>
+                <td style="padding: 8px;">${summary.total_comparison_cost:.2f}</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #222944;">
+                <td style="padding: 8px;"><strong>Cost Difference:</strong></td>
+                <td style="padding: 8px;">${summary.cost_difference:.2f}</td>
+            </tr>
+            <tr>
+                <td style="padding: 8px;"><strong>Percentage Change:</strong></td>
+                <td style="padding: 8px;">{summary.percentage_change:.2f}%</td>
+            </tr>
+        </table>
+    </div>
+    """
+
+
+def _money(value):
+    return '–' if math.isnan(value) else f"${value:,.2f}"
+
+
+def item_table_html(result, base_label, comparison_label):
+    """Build the per-item breakdown of a calculate_inflation result as one scrolling table.
+
+    One row per item, styled by the .item-table rules in page_styles, built
+    in a single pass over the result's item columns.
+    """
+    block = result.items
+    rows = [
+        f"<tr><td>{html.escape(item)}</td><td class='num'>{amount:g}</td>"
+        f"<td class='num'>{_money(base_price)}</td><td class='num'>{_money(comparison_price)}</td>"
+        f"<td class='num'>{_money(base_cost)}</td><td class='num'>{_money(comparison_cost)}</td>"
+        f"<td class='num'>{'–' if math.isnan(change) else f'{change:+.1f}%'}</td></tr>"
+        for item, amount, base_price, comparison_price, base_cost, comparison_cost, change in zip(
+            block.items, block.amounts.tolist(), block.base_prices.tolist(), block.comparison_prices.tolist(),
+            block.base_costs.tolist(), block.comparison_costs.tolist(), block.percentage_changes.tolist())
+    ]
+    return (
+        "<div class='item-table'><table><thead><tr><th>Item</th><th>Units</th>"
+        f"<th>{base_label} Price</th><th>{comparison_label} Price</th>"
+        f"<th>{base_label} Cost</th><th>{comparison_label} Cost</th><th>Change</th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table></div>"
+    )
+
+
+# This creates custom Formatting for dropdown menus and buttons
+@functools.lru_cache(maxsize=None)
+def generate_custom_css(button_bg_color, button_font_color, dropdown_bg_color, dropdown_font_color, number_input_bg_color, number_input_font_color, label_color, highlight_color, background_color):
+    custom_css = f'''
+    <style>
+    /* Button Styling */
+    .stButton > button {{
+        background-color: {button_bg_color} !important;
+        color: {button_font_color} !important;
+        border: none !important;
+        border-radius: 5px !important;
+        padding: 10px 20px !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    .stButton > button:hover {{
+        background-color: {highlight_color} !important;
+    }}
+
+    /* General dropdown styling */
+    div[data-baseweb="select"] {{
+        background-color: {dropdown_bg_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling the control (input field) */
+    div[data-baseweb="select"] > div {{
+        background-color: {dropdown_bg_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling the selected value */
+    div[data-baseweb="select"] .css-1uccc91-singleValue {{
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling the input field */
+    div[data-baseweb="select"] input {{
+        background-color: {dropdown_bg_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling the dropdown indicator (arrow) */
+    div[data-baseweb="select"] .css-1okebmr-indicatorSeparator {{
+        background-color: {dropdown_bg_color} !important;
+    }}
+
+    div[data-baseweb="select"] .css-tlfecz-indicatorContainer {{
+        color: {dropdown_font_color} !important;
+    }}
+
+    /* Styling the dropdown menu */
+    ul[data-testid="stVirtualDropdown"] {{
+        background-color: {dropdown_bg_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling the list of options */
+    ul[data-testid="stVirtualDropdown"] > div {{
+        background-color: {dropdown_bg_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling individual options */
+    ul[data-testid="stVirtualDropdown"] li {{
+        background-color: {dropdown_bg_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Hover effect for options */
+    ul[data-testid="stVirtualDropdown"] li:hover {{
+        background-color: {highlight_color} !important;
+        color: {button_font_color} !important; /* Changed to button font color */
+    }}
+
+    /* Styling for the options when selected */
+    ul[data-testid="stVirtualDropdown"] li[aria-selected="true"] {{
+        background-color: {highlight_color} !important;
+        color: {button_font_color} !important; /* Changed to button font color */
+    }}
+
+    /* General number input styling */
+    div[data-testid="stNumberInput"] input {{
+        background-color: {number_input_bg_color} !important;
+        color: {number_input_font_color} !important;
+        border: none !important;
+        border-radius: 5px !important;
+        padding: 10px !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Hover effect for the number input */
+    div[data-testid="stNumberInput"] input:hover {{
+        background-color: {highlight_color} !important;
+    }}
+
+    /* Focus effect for the number input */
+    div[data-testid="stNumberInput"] input:focus {{
+        background-color: {highlight_color} !important;
+        outline: none !important;
+    }}
+
+    /* Label styling */
+    label {{
+        color: {label_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Custom label styling for select boxes */
+    .stSelectbox label {{
+        color: {label_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Styling the highlighted buttons and selected items */
+    .st-ar.st-br.st-bq.st-ed.st-ee.st-af {{
+        background-color: {highlight_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Specific styling for the close buttons within selected items */
+    div.st-ak.st-al.st-bd.st-be.st-bf.st-as.st-bg.st-ct.st-ar.st-c4.st-c5.st-bk.st-c7 > span {{
+        background-color: {highlight_color} !important;
+        color: {dropdown_font_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Background color */
+    .stApp {{
+        background-color: {background_color} !important;
+        font-family: 'Gotham', sans-serif !important;
+    }}
+
+    /* Align input fields */
+    .stNumberInput {{
+        margin-bottom: 10px;
+    }}
+    </style>
+    '''
+    return custom_css
+
+
+# Style blocks that used to be emitted inline, one st.markdown call each
+_STATIC_CSS = """
+<style>
+span[data-baseweb="tag"] {
+  background-color: #3b8797 !important;
+}
+.custom-title {
+    font-family: 'Gotham', sans-serif;
+    font-size: 40px;
+    font-weight: bold;
+    color: #222944;
+    line-height: 1.2;
+}
+.custom-box {
+    border: 2px solid #222944;
+    padding: 10px;
+    border-radius: 5px;
+    background-color: #f9f9f9;
+    margin-top: -20px;
+    margin-bottom: 20px;
+    color: #222944; /* Text color */
+    font-family: 'Gotham', sans-serif; /* Font family */
+}
+.footer {
+    font-family: 'Gotham', sans-serif;
+    font-size: 14px;
+    color: #222944;
+    text-align: left;
+    margin-top: -20px;
+}
+.footer a {
+    color: #0073e6;
+    text-decoration: none;
+}
+.footer a:hover {
+    text-decoration: underline;
+}
+.item-table {
+    border: 2px solid #222944;
+    border-radius: 10px;
+    max-height: %(max_height)dpx;
+    overflow-y: auto;
+    font-family: 'Gotham', sans-serif;
+    color: #222944;
+}
+.item-table table {
+    width: 100%%;
+    border-collapse: collapse;
+}
+.item-table th {
+    position: sticky;
+    top: 0;
+    background-color: #F3F5F8;
+    text-align: left;
+}
+.item-table th, .item-table td {
+    padding: 6px 8px;
+    border-bottom: 1px solid #222944;
+}
+.item-table td.num {
+    text-align: right;
+    white-space: nowrap;
+}
+</style>
+""" % {'max_height': 40 + 36 * ITEM_TABLE_VISIBLE_ROWS}
+
+
+def _minify_css(markup):
+    markup = re.sub(r'/\*.*?\*/', '', markup, flags=re.S)
+    markup = re.sub(r'\s+', ' ', markup)
+    return re.sub(r'\s*([{}:;,>])\s*', r'\1', markup).replace('<style>', '').replace('</style>', '')
+
+
+@functools.lru_cache(maxsize=None)
+def page_styles():
+    """Return every style rule of the page as one minified <style> block, built once per process."""
+    themed = generate_custom_css(
+        button_bg_color="#8CB2CD",
+        button_font_color="#222944",
+        dropdown_bg_color="#426172",  # Heritage Cyan
+        dropdown_font_color="white",
+        number_input_bg_color="#426172",  # Heritage Blue
+        number_input_font_color="white",
+        label_color="#222944",  # Heritage Navy
+        highlight_color="#3b8797",  # Selected Item color (previously Orange)
+        background_color="#F3F5F8"  # Glacier Blue for a light background
+    )
+    return f"<style>{_minify_css(themed)}{_minify_css(_STATIC_CSS)}</style>"
@@ -0,0 +1,5 @@
+"""Make inflation_core importable when pytest runs from any directory, as the benchmarks do."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
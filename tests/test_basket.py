@@ -0,0 +1,85 @@
+"""BasketState's delta-updated totals must match calculate_inflation and basket_cost_series recomputed from scratch."""
+import random
+
+import numpy as np
+import pytest
+
+from inflation_core import basket as basket_module
+from inflation_core.basket import BasketState
+from inflation_core.dataset import GAP_METHODS, PriceDataset
+from inflation_core.inflation import calculate_inflation
+from inflation_core.loader import DEFAULT_DATA_PATH
+from inflation_core.series import basket_cost_series
+from inflation_core.sources import read_price_csv
+from inflation_core.store import PriceStore
+
+from test_bls import _ingest
+
+EDITS = 60
+UNKNOWN_ITEM = 'Not a priced item'
+
+
+def _unversioned(frame, gap_method, series_ids=None, area_names=None):
+    # With no version nothing goes through result_cache, so every comparison is a genuine recompute
+    return PriceDataset(frame, series_ids=series_ids, area_names=area_names, gap_method=gap_method)
+
+
+def _assert_matches(basket, dataset, periods, area=None):
+    items, quantities = basket.items, basket.quantities
+    for base_period, comparison_period in periods:
+        expected = calculate_inflation(items, quantities, base_period, comparison_period, dataset, area)
+        actual = basket.result(base_period, comparison_period)
+        for name, value in expected.summary.to_dict().items():
+            assert np.isclose(getattr(actual.summary, name), value, rtol=1e-9, equal_nan=True), (name, base_period, comparison_period)
+        assert actual.items.items == expected.items.items
+        for name in ('amounts', 'base_prices', 'comparison_prices'):
+            np.testing.assert_array_equal(getattr(actual.items, name), getattr(expected.items, name))
+
+    lookup = items if area is None else dataset.items_in_area(items, area)
+    expected = basket_cost_series(dataset, lookup, quantities)
+    actual = basket.series()
+    assert actual['Date'].tolist() == expected['Date'].tolist()
+    np.testing.assert_allclose(actual['TotalCost'].to_numpy(), expected['TotalCost'].to_numpy(), rtol=1e-9)
+    assert actual['Filled'].tolist() == expected['Filled'].tolist()
+
+
+def _random_edits(basket, dataset, pool, rng, area=None):
+    periods = dataset.periods
+    for _ in range(EDITS):
+        action = rng.random()
+        if action < 0.5:
+            basket.set(rng.choice(pool), rng.choice([0, 1, 2, 3, 0.5, 2.25]))
+        elif action < 0.75 and basket.items:
+            basket.remove(rng.choice(basket.items + [UNKNOWN_ITEM]))
+        else:
+            items = rng.sample(pool, rng.randint(0, min(6, len(pool))))
+            basket.update(items, [rng.randint(1, 4) for _ in items])
+        pairs = [(rng.choice(periods), rng.choice(periods)) for _ in range(3)] + [((1990, 1), periods[-1])]
+        _assert_matches(basket, dataset, pairs, area)
+
+
+@pytest.mark.parametrize('gap_method', GAP_METHODS)
+def test_random_edits_match_full_recompute(gap_method):
+    dataset = _unversioned(read_price_csv(DEFAULT_DATA_PATH), gap_method)
+    rng = random.Random(gap_method)
+    pool = rng.sample(dataset.items, 12) + [UNKNOWN_ITEM]
+    _random_edits(BasketState(dataset), dataset, pool, rng)
+
+
+@pytest.mark.parametrize('gap_method', GAP_METHODS)
+def test_random_edits_in_an_area_match_full_recompute(tmp_path, gap_method):
+    _ingest(str(tmp_path / 'store'))
+    store = PriceStore.open(str(tmp_path / 'store'))
+    dataset = _unversioned(store.to_frame(), gap_method, store.series_ids, store.area_names)
+    national = [item for item, series_id in zip(dataset.items, dataset.series_ids) if series_id[3:7] == '0000']
+    rng = random.Random(gap_method)
+    _random_edits(BasketState(dataset, '0400'), dataset, national + [UNKNOWN_ITEM], rng, '0400')
+
+
+def test_resync_keeps_matching(monkeypatch):
+    monkeypatch.setattr(basket_module, 'RESYNC_EDITS', 7)
+    dataset = _unversioned(read_price_csv(DEFAULT_DATA_PATH), 'ffill')
+    rng = random.Random(0)
+    basket = BasketState(dataset)
+    _random_edits(basket, dataset, rng.sample(dataset.items, 8), rng)
+    assert basket.edits < 7
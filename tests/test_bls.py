@@ -0,0 +1,68 @@
+"""Ingest the checked-in BLS sample files (data/bls_sample) into a price store, offline."""
+import os
+import shutil
+
+import numpy as np
+
+from inflation_core.bls import build_catalog, ingest_bls, iter_observations
+from inflation_core.store import PriceStore, month_code
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'bls_sample')
+
+
+def _ingest(store_dir, source_dir=SAMPLE_DIR):
+    store = PriceStore.open(store_dir) if os.path.exists(os.path.join(store_dir, 'catalog.json')) else PriceStore()
+    counts = ingest_bls(store, source_dir, chunk_rows=50)
+    store.save(store_dir)
+    return store, counts
+
+
+def test_first_ingest_loads_sample_and_reingest_loads_nothing(tmp_path):
+    store_dir = str(tmp_path / 'store')
+    store, counts = _ingest(store_dir)
+    assert counts == {'read': 378, 'loaded': 270, 'skipped': 108}
+    assert (store.rows, len(store.series_ids)) == (30, 9)
+
+    reopened, counts = _ingest(store_dir)
+    assert counts == {'read': 378, 'loaded': 0, 'skipped': 378}
+    assert reopened.content_digest() == store.content_digest()
+
+
+def test_annual_averages_and_dashes_are_dropped(tmp_path):
+    source_dir = tmp_path / 'bls'
+    shutil.copytree(SAMPLE_DIR, source_dir)
+    # An annual average (M13) with a value, and a monthly row BLS left blank as '-'
+    (source_dir / 'ap.data.99.Extra').write_text(
+        'series_id\tyear\tperiod\tvalue\tfootnote_codes\n'
+        'APU0000708111      \t2024\tM13\t       9.999\t\n'
+        'APU0000708111      \t2024\tM07\t           -\t\n'
+        'APU0000708111      \t2024\tM08\t       3.500\t\n'
+    )
+    for codes, _, _ in iter_observations(os.path.join(SAMPLE_DIR, 'ap.data.0.Current')):
+        assert np.all((codes % 12 >= 0) & (codes % 12 <= 11))
+
+    store, counts = _ingest(str(tmp_path / 'store'), str(source_dir))
+    assert counts == {'read': 380, 'loaded': 271, 'skipped': 109}
+    column = store.series_ids.index('APU0000708111')
+    prices = dict(zip(store.months.tolist(), store.prices[:, column].tolist()))
+    # M13 of 2024 must not be read as January 2025, and '-' leaves the month without a price
+    assert month_code(2025, 1) not in prices
+    assert np.isnan(prices[month_code(2024, 7)])
+    assert prices[month_code(2024, 8)] == 3.5
+    assert 9.999 not in prices.values()
+
+
+def test_catalog_labels_and_area_names(tmp_path):
+    catalog = build_catalog(SAMPLE_DIR)
+    assert catalog['APU0000708111']['label'] == 'Eggs, grade A, large, per doz.'
+    assert catalog['APU0100708111']['label'] == 'Eggs, grade A, large, per doz. (Northeast)'
+    assert catalog['APU0400709112']['area_name'] == 'West'
+
+    store, _ = _ingest(str(tmp_path / 'store'))
+    assert store.area_names == {'0000': 'U.S. city average', '0100': 'Northeast', '0400': 'West'}
+    # Generated labels name the columns, not the curated goods_to_series_id names
+    assert store.label('APU0000709112') == 'Milk, fresh, whole, fortified, per gal. (3.8 lit)'
+    assert store.label('APU0400702111') == 'Bread, white, pan, per lb. (453.6 gm) (West)'
+    dataset = PriceStore.open(str(tmp_path / 'store')).to_dataset()
+    assert 'Eggs, grade A, large, per doz. (Northeast)' in dataset.items
+    assert dataset.area_names['0400'] == 'West'
@@ -0,0 +1,21 @@
+"""Period parsing shared by the app, the batch tool and the service."""
+import pytest
+
+from inflation_core.dataset import normalize_period
+
+
+@pytest.mark.parametrize('period, expected', [
+    (2019, (2019, 6)),
+    ('2019', (2019, 6)),
+    (' 2019 ', (2019, 6)),
+    ((2019, 3), (2019, 3)),
+    ('2019-03', (2019, 3)),
+    ('June 2020', (2020, 6)),
+])
+def test_normalize_period(period, expected):
+    assert normalize_period(period) == expected
+
+
+def test_unparseable_period_raises_value_error():
+    with pytest.raises(ValueError):
+        normalize_period('')
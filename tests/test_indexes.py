@@ -0,0 +1,87 @@
+"""Chained indexes and their contributions checked against naive per-month sums."""
+import numpy as np
+import pytest
+
+from inflation_core.dataset import PriceDataset
+from inflation_core.indexes import FORMULAS, chained_index_batch
+from inflation_core.loader import DEFAULT_DATA_PATH
+from inflation_core.sources import read_price_csv
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    # Unfilled, so items drop in and out of the table and links are taken over matched items only
+    return PriceDataset(read_price_csv(DEFAULT_DATA_PATH))
+
+
+def _naive_links(dataset, items, quantities):
+    """Loop over months and items the slow way; quantities is months x items."""
+    prices = [[dataset.prices[dataset.period_index[period], dataset.items.index(item)] for item in items]
+              for period in dataset.periods]
+    links = {formula: [np.nan] for formula in FORMULAS}
+    for month in range(1, len(prices)):
+        sums = {'q0p0': 0.0, 'q0p1': 0.0, 'q1p0': 0.0, 'q1p1': 0.0}
+        for column in range(len(items)):
+            p0, p1 = prices[month - 1][column], prices[month][column]
+            if np.isnan(p0) or np.isnan(p1) or p0 <= 0 or p1 <= 0:
+                continue
+            q0, q1 = quantities[month - 1][column], quantities[month][column]
+            sums['q0p0'] += q0 * p0
+            sums['q0p1'] += q0 * p1
+            sums['q1p0'] += q1 * p0
+            sums['q1p1'] += q1 * p1
+        laspeyres = sums['q0p1'] / sums['q0p0'] if sums['q0p0'] > 0 else np.nan
+        paasche = sums['q1p1'] / sums['q1p0'] if sums['q1p0'] > 0 else np.nan
+        links['laspeyres'].append(laspeyres)
+        links['paasche'].append(paasche)
+        links['fisher'].append(np.sqrt(laspeyres * paasche))
+    return links
+
+
+def _baskets(dataset, seed):
+    rng = np.random.default_rng(seed)
+    items = list(rng.choice(dataset.items, 8, replace=False))
+    fixed = rng.integers(0, 4, len(items)).astype(float)
+    varying = rng.uniform(0, 3, (len(dataset.periods), len(items)))
+    varying[rng.random(varying.shape) < 0.2] = 0
+    return items, fixed, varying
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_links_match_naive_loop(dataset, seed):
+    items, fixed, varying = _baskets(dataset, seed)
+    for quantities, naive_quantities in ((fixed, [fixed] * len(dataset.periods)), (varying[None], varying)):
+        result = chained_index_batch(dataset, items, quantities)
+        expected = _naive_links(dataset, items, naive_quantities)
+        for formula in FORMULAS:
+            np.testing.assert_allclose(result[formula]['links'][0], expected[formula], rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('reference', [None, (2019, 6)])
+def test_contributions_sum_to_link_and_index_changes(dataset, reference):
+    items, fixed, varying = _baskets(dataset, 3)
+    for quantities in (fixed, varying[None]):
+        result = chained_index_batch(dataset, items, quantities, reference=reference, contributions=True)
+        for formula in FORMULAS:
+            links = result[formula]['links'][0]
+            monthly = result[formula]['contributions'][0].sum(axis=1)
+            linked = ~np.isnan(links)
+            assert linked.sum() > len(links) // 2
+            np.testing.assert_allclose(monthly[linked], (links[linked] - 1) * 100, atol=1e-9)
+
+            index = result[formula]['index'][0]
+            cumulative = result[formula]['cumulative_contributions'][0].sum(axis=1)
+            started = ~np.isnan(index)
+            np.testing.assert_allclose(cumulative[started], index[started] - 100, atol=1e-8)
+
+
+def test_fully_priced_fixed_basket_chains_to_the_direct_cost_ratio(dataset):
+    rows = [dataset.period_index[period] for period in dataset.periods]
+    complete = np.flatnonzero(dataset.observed[rows].all(axis=0))
+    items = [dataset.items[position] for position in complete[:10]]
+    quantities = np.arange(1, len(items) + 1, dtype=float)
+    costs = dataset.prices[np.ix_(rows, complete[:10])] @ quantities
+
+    result = chained_index_batch(dataset, items, quantities)
+    for formula in FORMULAS:
+        np.testing.assert_allclose(result[formula]['index'][0], costs / costs[0] * 100, rtol=1e-10)
@@ -0,0 +1,20 @@
+"""Request validation in the inflation service."""
+import json
+
+import pytest
+
+from inflation_core.service import BadRequest, canonical_query
+
+
+@pytest.mark.parametrize('quantities', ['[1e400]', '[NaN]', '[-Infinity]', '[1' + '0' * 400 + ']', '[1e308, 1e308]'])
+def test_non_finite_quantities_are_rejected(quantities):
+    items = json.dumps(['Eggs - doz.'] * len(json.loads(quantities)))
+    payload = json.loads(f'{{"items": {items}, "quantities": {quantities}, "base": 2019, "comparison": 2024}}')
+    with pytest.raises(BadRequest, match='finite'):
+        canonical_query(payload)
+
+
+def test_repeated_lines_are_merged():
+    payload = {'items': ['Eggs - doz.', 'Eggs - doz.', 'Milk'], 'quantities': [2, 1.5, 0], 'base': '2019-06',
+               'comparison': 2024}
+    assert canonical_query(payload) == ((('Eggs - doz.', 3.5),), (2019, 6), (2024, 6))
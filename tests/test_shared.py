@@ -0,0 +1,30 @@
+"""Publishing generations of the price table into a shared directory."""
+import os
+import shutil
+
+import pytest
+
+from inflation_core.loader import DEFAULT_DATA_PATH
+from inflation_core.shared import publish, read_pointer
+
+
+def _generations(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith('gen-'))
+
+
+def test_publish_keeps_the_newest_generations(tmp_path):
+    directory = str(tmp_path / 'shared')
+    data_path = str(tmp_path / 'prices.csv')
+    shutil.copy(DEFAULT_DATA_PATH, data_path)
+    for generation in range(1, 4):
+        pointer = publish(directory, data_path, gap_methods=['exclude'], keep=1, force=True)
+        assert pointer['generation'] == generation
+        assert _generations(directory) == [pointer['file']]
+    assert read_pointer(directory) == pointer
+    assert not os.path.exists(os.path.join(directory, 'CURRENT.tmp'))
+
+
+def test_publish_rejects_keeping_no_generation(tmp_path):
+    with pytest.raises(ValueError, match='keep'):
+        publish(str(tmp_path / 'shared'), DEFAULT_DATA_PATH, keep=0)
+    assert not os.path.exists(tmp_path / 'shared')
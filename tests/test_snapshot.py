@@ -0,0 +1,32 @@
+"""A dataset loaded through a compiled snapshot must sit on the mapped prices and match one parsed from the CSV."""
+import shutil
+
+import numpy as np
+import pytest
+
+from inflation_core import loader
+from inflation_core.dataset import GAP_METHODS, PriceDataset
+from inflation_core.loader import DEFAULT_DATA_PATH
+from inflation_core.snapshot import compile_snapshot
+from inflation_core.sources import read_price_csv
+
+
+@pytest.mark.parametrize('gap_method', GAP_METHODS)
+def test_snapshot_dataset_maps_prices_without_copying(tmp_path, gap_method):
+    csv_path = str(tmp_path / 'prices.csv')
+    shutil.copy(DEFAULT_DATA_PATH, csv_path)
+    compile_snapshot(csv_path)
+    loader.clear_cache()
+
+    dataset = loader.load_dataset(csv_path, gap_method)
+    assert loader.cache_stats()['snapshot_loads'] == 1
+    mapped = loader._entries[csv_path]['prices']
+    if gap_method == 'exclude':
+        assert dataset.prices is mapped
+    assert np.shares_memory(dataset.frame[dataset.items].to_numpy(), mapped)
+
+    expected = PriceDataset(read_price_csv(csv_path), gap_method=gap_method)
+    np.testing.assert_array_equal(dataset.prices, expected.prices)
+    np.testing.assert_array_equal(dataset.filled_mask, expected.filled_mask)
+    assert dataset.periods == expected.periods
+    loader.clear_cache()